@@ -0,0 +1,85 @@
+"""Time parse_decimal and a full CSV import on a generated sample file.
+
+Usage: python benchmarks/csv_import.py [--rows N] [--repeat N]
+
+The sample is built from a fixed seed, so runs on different machines use the
+same data.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from portfolio.transaction_importer import parsers  # noqa: E402
+from portfolio.transaction_importer.csv_import import import_transactions_from_csv  # noqa: E402
+
+COLUMN_MAPPINGS = {'date': 'Date', 'action': 'Action', 'symbol': 'Symbol', 'quantity': 'Quantity',
+                   'price': 'Price', 'fees': 'Fees', 'amount': 'Amount', 'account_name': 'Account'}
+
+SYMBOLS = ['AAPL', 'MSFT', 'SPY', 'QQQ', 'NVDA', 'VTI', 'AMZN', 'GOOG']
+ACCOUNTS = ['Brokerage (Schwab)', 'IRA (Fidelity)', 'Main']
+
+
+def write_sample(path: str, rows: int, seed: int = 0) -> None:
+    """Write a mixed buy/sell/dividend/cash file with realistic number formats."""
+    rng = random.Random(seed)
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(COLUMN_MAPPINGS.values()))
+        for i in range(rows):
+            date = f"{1 + i % 12:02d}/{1 + i % 28:02d}/2024"
+            account = rng.choice(ACCOUNTS)
+            kind = rng.random()
+            if kind < 0.7:
+                quantity = rng.randint(1, 200)
+                price = f"{rng.uniform(5, 600):.2f}"
+                amount = float(price) * quantity
+                action = rng.choice(['Buy', 'Sell'])
+                writer.writerow([date, action, rng.choice(SYMBOLS), quantity, f"${price}",
+                                 rng.choice(['0', '0.65', '']), f"${amount:,.2f}", account])
+            elif kind < 0.85:
+                writer.writerow([date, 'Dividend', rng.choice(SYMBOLS), '', '', '',
+                                 f"{rng.uniform(1, 500):.2f}", account])
+            else:
+                writer.writerow([date, rng.choice(['Deposit', 'Withdrawal']), '', '', '', '',
+                                 f"${rng.choice([100, 250, 500, 1000, 2500]):,.2f}", account])
+
+
+def sample_cells(path: str) -> list:
+    """Return every numeric cell of the sample, in file order."""
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        return [row[column] for row in reader for column in ('Quantity', 'Price', 'Fees', 'Amount')]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000, help="rows in the generated file (default: 50000)")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs to take the best of (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, 'sample.csv')
+        write_sample(path, args.rows)
+        cells = sample_cells(path)
+
+        def parse_all():
+            for cell in cells:
+                parsers.parse_decimal(cell)
+
+        best = min(timeit.repeat(parse_all, number=1, repeat=args.repeat))
+        print(f"parse_decimal: {best / len(cells) * 1e9:.0f} ns/cell over {len(cells)} cells")
+
+        import_transactions_from_csv(path, COLUMN_MAPPINGS)
+        best = min(timeit.repeat(lambda: import_transactions_from_csv(path, COLUMN_MAPPINGS),
+                                 number=1, repeat=args.repeat))
+        print(f"import_transactions_from_csv: {best:.2f}s for {args.rows} rows")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,4 @@
-import sys
-from PySide6.QtWidgets import QApplication
-from portfolio.transaction_importer.review_window import TransactionReviewWindow
-
-
 def main():
-    app = QApplication(sys.argv)
-    window = TransactionReviewWindow()
-    window.show()
-    sys.exit(app.exec())
+    # The importer's entry point sets up logging and checks the database before starting Qt
+    from portfolio.transaction_importer.main import main as import_main
+    import_main()
@@ -0,0 +1,109 @@
+"""Treat NULL option columns as equal in uix_symbol_details
+
+Revision ID: b7e9c8726489
+Revises: 
+Create Date: 2026-10-14 07:18:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e9c8726489'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYMBOL_DETAIL_COLUMNS = ['ticker', 'instrument_type', 'option_type', 'expiration_date', 'strike_price']
+
+# Tables whose rows are unique per symbol together with these columns, with the
+# columns added up and the columns taking their latest value when two rows for
+# duplicate symbols are merged
+MERGED_SYMBOL_TABLES = {
+    'positions': (['account_id'], ['quantity', 'cost_basis', 'market_value', 'unrealized_pnl'], ['last_updated']),
+    'position_snapshots': (['account_id', 'snapshot_date'],
+                           ['quantity', 'cost_basis', 'market_value', 'unrealized_pnl'], []),
+}
+
+# Tables whose symbol references can simply be repointed
+REPOINTED_SYMBOL_TABLES = ['transactions', 'realized_pnl']
+
+
+def _merge_symbol_rows(table, key_columns, summed_columns, latest_columns):
+    """Move a table's rows onto the kept symbols, merging rows that would collide.
+
+    Each group of rows with the same key for one kept symbol keeps a single row,
+    preferring the one already on the kept symbol, with the summed columns added up
+    and the latest columns set to their greatest value.
+    """
+    keys = ', '.join(f't.{column}' for column in key_columns)
+    op.execute(f"""
+        CREATE TEMPORARY TABLE {table}_merge AS
+        SELECT t.id, COALESCE(m.keep_id, t.symbol_id) AS target_id,
+               first_value(t.id) OVER (
+                   PARTITION BY {keys}, COALESCE(m.keep_id, t.symbol_id)
+                   ORDER BY m.old_id IS NOT NULL, t.id
+               ) AS survivor_id
+        FROM {table} t
+        LEFT JOIN symbol_merge m ON m.old_id = t.symbol_id
+        WHERE COALESCE(m.keep_id, t.symbol_id) IN (SELECT keep_id FROM symbol_merge)
+    """)
+    aggregates = ', '.join([f'sum(t.{column}) AS {column}' for column in summed_columns]
+                           + [f'max(t.{column}) AS {column}' for column in latest_columns])
+    assignments = ', '.join(f'{column} = s.{column}' for column in summed_columns + latest_columns)
+    op.execute(f"""
+        UPDATE {table} t
+        SET {assignments},
+            average_price = CASE WHEN s.quantity <> 0 THEN s.cost_basis / s.quantity ELSE t.average_price END
+        FROM (
+            SELECT r.survivor_id, {aggregates}
+            FROM {table}_merge r JOIN {table} t ON t.id = r.id
+            GROUP BY r.survivor_id
+            HAVING count(*) > 1
+        ) s
+        WHERE t.id = s.survivor_id
+    """)
+    op.execute(f"DELETE FROM {table} t USING {table}_merge r WHERE t.id = r.id AND r.id <> r.survivor_id")
+    op.execute(f"""
+        UPDATE {table} t SET symbol_id = r.target_id
+        FROM {table}_merge r
+        WHERE t.id = r.id AND t.symbol_id <> r.target_id
+    """)
+    op.execute(f"DROP TABLE {table}_merge")
+
+
+def upgrade() -> None:
+    # Requires PostgreSQL 15+. The old constraint let duplicate stock symbols in,
+    # so merge them first: keep the oldest symbol of each set of details, move
+    # everything that references the others onto it, then delete them
+    partition = ', '.join(SYMBOL_DETAIL_COLUMNS)
+    op.execute(f"""
+        CREATE TEMPORARY TABLE symbol_merge AS
+        SELECT id AS old_id, keep_id
+        FROM (
+            SELECT id, first_value(id) OVER (PARTITION BY {partition} ORDER BY created_at, id) AS keep_id
+            FROM symbols
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    for table in REPOINTED_SYMBOL_TABLES:
+        op.execute(f"UPDATE {table} t SET symbol_id = m.keep_id FROM symbol_merge m WHERE t.symbol_id = m.old_id")
+    for table, (key_columns, summed_columns, latest_columns) in MERGED_SYMBOL_TABLES.items():
+        _merge_symbol_rows(table, key_columns, summed_columns, latest_columns)
+    op.execute("DELETE FROM symbols s USING symbol_merge m WHERE s.id = m.old_id")
+    op.execute("DROP TABLE symbol_merge")
+
+    op.drop_constraint('uix_symbol_details', 'symbols', type_='unique')
+    op.create_unique_constraint(
+        'uix_symbol_details', 'symbols', SYMBOL_DETAIL_COLUMNS,
+        postgresql_nulls_not_distinct=True
+    )
+
+
+def downgrade() -> None:
+    # Duplicate symbols merged by the upgrade stay merged
+    op.drop_constraint('uix_symbol_details', 'symbols', type_='unique')
+    op.create_unique_constraint('uix_symbol_details', 'symbols', SYMBOL_DETAIL_COLUMNS)
@@ -1,16 +1,22 @@
-from portfolio.models import (
-    Base,
-    User,
-    Account,
-    Symbol,
-    Transaction,
-    Position,
-    PositionSnapshot,
-    RealizedPnL,
-    InstrumentType,
-    OptionType,
-    TransactionType,
-)
+import importlib
+
+__version__ = "0.1.0"
+
+# Model names are resolved lazily so that importing a lightweight submodule
+# such as ``portfolio.cli`` does not pull in SQLAlchemy.
+_LAZY = {
+    "Base": "portfolio.models",
+    "User": "portfolio.models",
+    "Account": "portfolio.models",
+    "Symbol": "portfolio.models",
+    "Transaction": "portfolio.models",
+    "Position": "portfolio.models",
+    "PositionSnapshot": "portfolio.models",
+    "RealizedPnL": "portfolio.models",
+    "InstrumentType": "portfolio.models",
+    "OptionType": "portfolio.models",
+    "TransactionType": "portfolio.models",
+}
 
 __all__ = [
     "Base",
@@ -24,4 +30,20 @@ __all__ = [
     "InstrumentType",
     "OptionType",
     "TransactionType",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Import the submodule defining ``name`` on first access (PEP 562)."""
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
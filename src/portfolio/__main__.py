@@ -1,34 +1,58 @@
 import sys
 import argparse
 
+from portfolio import __version__
 
-def main():
-    parser = argparse.ArgumentParser(description="Portfolio Tracker CLI")
-    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+# Subcommands and their help text, used to build the parser
+COMMANDS = {
+    "db": "Database management commands",
+    "import": "Import transactions from CSV",
+}
 
-    # Add db command - delegates to cli.main
-    db_parser = subparsers.add_parser("db", help="Database management commands")
 
-    # Add import command
-    import_parser = subparsers.add_parser("import", help="Import transactions from CSV")
+def _sniff_subcommand():
+    """Return the first command-line argument, or None if there isn't one."""
+    return sys.argv[1] if len(sys.argv) > 1 else None
 
-    args = parser.parse_args()
 
-    if args.command == "db":
+def _build_parser():
+    """Build the top-level argument parser."""
+    parser = argparse.ArgumentParser(prog="portfolio", description="Portfolio Tracker CLI")
+    parser.add_argument("-v", "--version", action="version", version=f"portfolio {__version__}")
+    subparsers = parser.add_subparsers(dest="command", help="Command to run")
+    for name, help_text in COMMANDS.items():
+        subparsers.add_parser(name, help=help_text)
+    return parser
+
+
+def main():
+    command = _sniff_subcommand()
+
+    # Fast path: answer version requests before building any parsers
+    if command in ('-v', '--version'):
+        print(f"portfolio {__version__}")
+        return
+    if command in ('-h', '--help', None):
+        _build_parser().print_help()
+        return
+
+    # Known subcommands dispatch directly without building the top-level parser
+    if command == "db":
         # Import and run the database CLI
         from portfolio.cli import main as db_main
         sys.argv.pop(1)  # Remove the 'db' argument
-        db_main()
+        return db_main()
 
-    elif args.command == "import":
+    if command == "import":
         # Import and run the transaction importer
         from portfolio.transaction_importer.main import main as import_main
-        import_main()
+        return import_main()
 
-    else:
-        parser.print_help()
+    # Unknown arguments: build the parser so argparse reports the error
+    parser = _build_parser()
+    parser.parse_args()
+    parser.print_help()
 
 
 if __name__ == "__main__":
     main()
-
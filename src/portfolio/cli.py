@@ -1,47 +1,49 @@
 import argparse
+import functools
 import os
 import sys
 from pathlib import Path
 
-from sqlalchemy import inspect
-from alembic import command
-from alembic.config import Config
-
-from portfolio.database import engine, Base
-from portfolio.models import *  # Import all models to ensure they're registered with Base.metadata
+# alembic.ini lives in the project root
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
 
 
+@functools.lru_cache(maxsize=1)
 def get_alembic_config():
-    """Get the Alembic configuration"""
-    # Find the alembic.ini file in the project root
-    project_root = Path(__file__).parent.parent.parent
-    alembic_ini_path = project_root / "alembic.ini"
+    """Get the Alembic configuration (built once per process)"""
+    from alembic.config import Config
 
-    if not alembic_ini_path.exists():
-        print(f"Error: alembic.ini not found at {alembic_ini_path}")
+    if not ALEMBIC_INI.exists():
+        print(f"Error: alembic.ini not found at {ALEMBIC_INI}")
         sys.exit(1)
 
     # Create Alembic configuration
-    alembic_cfg = Config(str(alembic_ini_path))
+    alembic_cfg = Config(str(ALEMBIC_INI))
     return alembic_cfg
 
 
 def init_db():
     """Initialize the database tables"""
-    inspector = inspect(engine)
-    existing_tables = inspector.get_table_names()
+    from portfolio.database import get_engine
+    # Importing the models registers their tables on Base.metadata
+    from portfolio.models import Base, create_enum_types
 
-    if not existing_tables:
-        print("Creating database tables...")
-        Base.metadata.create_all(bind=engine)
-        print("Database tables created successfully.")
-    else:
-        print(f"Database already contains tables: {', '.join(existing_tables)}")
-        print("Use 'alembic upgrade head' to apply any pending migrations.")
+    engine = get_engine(profile="cli")
+
+    # checkfirst skips types and tables that already exist, so no separate
+    # inspection round trip is needed
+    with engine.begin() as connection:
+        create_enum_types(connection)
+        Base.metadata.create_all(bind=connection, checkfirst=True)
+
+    print("Ensured tables exist: " + ", ".join(t.name for t in Base.metadata.sorted_tables))
+    print("Use 'alembic upgrade head' to apply any pending migrations.")
 
 
 def create_migration(message):
     """Create a new migration"""
+    from alembic import command
+
     alembic_cfg = get_alembic_config()
     command.revision(alembic_cfg, message=message, autogenerate=True)
     print(f"Created new migration: {message}")
@@ -49,6 +51,8 @@ def create_migration(message):
 
 def upgrade_db(revision="head"):
     """Upgrade the database to the specified revision"""
+    from alembic import command
+
     alembic_cfg = get_alembic_config()
     command.upgrade(alembic_cfg, revision)
     print(f"Database upgraded to: {revision}")
@@ -56,6 +60,8 @@ def upgrade_db(revision="head"):
 
 def downgrade_db(revision="-1"):
     """Downgrade the database by the specified number of revisions"""
+    from alembic import command
+
     alembic_cfg = get_alembic_config()
     command.downgrade(alembic_cfg, revision)
     print(f"Database downgraded: {revision}")
@@ -63,6 +69,8 @@ def downgrade_db(revision="-1"):
 
 def show_migrations():
     """Show migration history"""
+    from alembic import command
+
     alembic_cfg = get_alembic_config()
     command.history(alembic_cfg, verbose=True)
 
@@ -1,14 +1,13 @@
 import enum
 import uuid
-from datetime import date, datetime
+from types import MappingProxyType
+from datetime import date
 from decimal import Decimal
-from typing import Optional
 
 from sqlalchemy import (
     Boolean,
     Column,
     Date,
-    Enum,
     ForeignKey,
     Integer,
     Numeric,
@@ -16,7 +15,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import ENUM, UUID
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -85,14 +84,21 @@ class OptionType(enum.Enum):
     PUT = "put"
 
 
+# Native PostgreSQL enum types, named explicitly (matching the names SQLAlchemy
+# derived before) and created once by create_enum_types() rather than checked
+# per column during table DDL
+instrument_type_enum = ENUM(InstrumentType, name="instrumenttype", create_type=False)
+option_type_enum = ENUM(OptionType, name="optiontype", create_type=False)
+
+
 class Symbol(Base):
     __tablename__ = "symbols"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     ticker = Column(String(20), nullable=False)
     name = Column(String(255), nullable=True)
-    instrument_type = Column(Enum(InstrumentType), nullable=False)
-    option_type = Column(Enum(OptionType), nullable=True)
+    instrument_type = Column(instrument_type_enum, nullable=False)
+    option_type = Column(option_type_enum, nullable=True)
     expiration_date = Column(Date, nullable=True)  # For options
     strike_price = Column(Numeric(20, 8), nullable=True)  # For options
     created_at = Column(Date, nullable=False, default=date.today)
@@ -112,7 +118,10 @@ class Symbol(Base):
             'option_type', 
             'expiration_date', 
             'strike_price', 
-            name='uix_symbol_details'
+            name='uix_symbol_details',
+            # Stocks leave the option columns NULL; treat those as equal so
+            # INSERT ... ON CONFLICT catches duplicate stock symbols too
+            postgresql_nulls_not_distinct=True
         ),
     )
 
@@ -143,13 +152,16 @@ class TransactionType(enum.Enum):
     OTHER = "other"
 
 
+transaction_type_enum = ENUM(TransactionType, name="transactiontype", create_type=False)
+
+
 class Transaction(Base):
     __tablename__ = "transactions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     account_id = Column(UUID(as_uuid=True), ForeignKey("accounts.id", ondelete="CASCADE"), nullable=False)
     symbol_id = Column(UUID(as_uuid=True), ForeignKey("symbols.id"), nullable=True)  # Nullable for cash transactions
-    transaction_type = Column(Enum(TransactionType), nullable=False)
+    transaction_type = Column(transaction_type_enum, nullable=False)
     transaction_date = Column(Date, nullable=False)
     quantity = Column(Numeric(20, 8), nullable=True)  # Nullable for dividends/interest
     price = Column(Numeric(20, 8), nullable=True)  # Nullable for cash deposits/withdrawals
@@ -246,3 +258,20 @@ class RealizedPnL(Base):
 
     def __repr__(self):
         return f"<RealizedPnL(date='{self.realized_date}', symbol='{self.symbol_id}', pnl='{self.realized_pnl}')>"
+
+
+# Read-only value -> member tables for O(1) conversion of imported strings
+INSTRUMENT_TYPE_BY_VALUE = MappingProxyType({m.value: m for m in InstrumentType})
+OPTION_TYPE_BY_VALUE = MappingProxyType({m.value: m for m in OptionType})
+TRANSACTION_TYPE_BY_VALUE = MappingProxyType({m.value: m for m in TransactionType})
+
+
+def create_enum_types(bind, checkfirst=True):
+    """Create the native enum types if they don't exist yet.
+
+    The enum columns use create_type=False, so this must run before the tables are created.
+    Migrations that add enum columns call it with op.get_bind(), passing
+    checkfirst=not context.is_offline_mode() since offline scripts can't query the database.
+    """
+    for enum_type in (instrument_type_enum, option_type_enum, transaction_type_enum):
+        enum_type.create(bind, checkfirst=checkfirst)
@@ -1,23 +1,25 @@
 from decimal import Decimal
 from datetime import date
-from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 from portfolio.models import InstrumentType, OptionType, TransactionType
 
 
 # Base schemas with common attributes
 class BaseSchema(BaseModel):
-    id: Optional[UUID] = None
+    # Build each model's validator on first use instead of at class definition
+    model_config = ConfigDict(defer_build=True)
+
+    id: UUID | None = None
 
 
 class UserBase(BaseSchema):
     username: str
     email: str
-    first_name: Optional[str] = None
-    last_name: Optional[str] = None
+    first_name: str | None = None
+    last_name: str | None = None
     is_active: bool = True
 
 
@@ -37,8 +39,8 @@ class User(UserBase):
 class AccountBase(BaseSchema):
     name: str
     broker: str
-    account_number: Optional[str] = None
-    description: Optional[str] = None
+    account_number: str | None = None
+    description: str | None = None
     is_taxable: bool = True
     is_active: bool = True
 
@@ -59,11 +61,11 @@ class Account(AccountBase):
 
 class SymbolBase(BaseSchema):
     ticker: str
-    name: Optional[str] = None
+    name: str | None = None
     instrument_type: InstrumentType
-    option_type: Optional[OptionType] = None
-    expiration_date: Optional[date] = None
-    strike_price: Optional[Decimal] = None
+    option_type: OptionType | None = None
+    expiration_date: date | None = None
+    strike_price: Decimal | None = None
 
 
 class SymbolCreate(SymbolBase):
@@ -81,15 +83,15 @@ class Symbol(SymbolBase):
 
 class TransactionBase(BaseSchema):
     account_id: UUID
-    symbol_id: Optional[UUID] = None
+    symbol_id: UUID | None = None
     transaction_type: TransactionType
     transaction_date: date
-    quantity: Optional[Decimal] = None
-    price: Optional[Decimal] = None
+    quantity: Decimal | None = None
+    price: Decimal | None = None
     amount: Decimal
     fees: Decimal = Decimal("0.00")
-    notes: Optional[str] = None
-    related_transaction_id: Optional[UUID] = None
+    notes: str | None = None
+    related_transaction_id: UUID | None = None
 
 
 class TransactionCreate(TransactionBase):
@@ -111,9 +113,9 @@ class PositionBase(BaseSchema):
     quantity: Decimal
     cost_basis: Decimal
     average_price: Decimal
-    current_price: Optional[Decimal] = None
-    market_value: Optional[Decimal] = None
-    unrealized_pnl: Optional[Decimal] = None
+    current_price: Decimal | None = None
+    market_value: Decimal | None = None
+    unrealized_pnl: Decimal | None = None
     last_updated: date = Field(default_factory=date.today)
 
 
@@ -160,7 +162,7 @@ class RealizedPnLBase(BaseSchema):
     proceeds: Decimal
     cost_basis: Decimal
     realized_pnl: Decimal
-    holding_period_days: Optional[int] = None
+    holding_period_days: int | None = None
 
 
 class RealizedPnLCreate(RealizedPnLBase):
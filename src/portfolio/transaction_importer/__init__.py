@@ -1,13 +1,32 @@
-from portfolio.transaction_importer.main import main
-from portfolio.transaction_importer.review_window import TransactionReviewWindow
-from portfolio.transaction_importer.column_mapper import ColumnMapperDialog
-from portfolio.transaction_importer.account_selection import AccountSelectionDialog
-from portfolio.transaction_importer.table_model import TransactionTableModel
-from portfolio.transaction_importer.delegates import DateDelegate, ComboBoxDelegate, DecimalDelegate, JSONDelegate
-from portfolio.transaction_importer.parsers import parse_date, parse_decimal, parse_json, parse_option_details, standardize_option_transaction_type, calculate_amount
-from portfolio.transaction_importer.csv_import import import_transactions_from_csv
-from portfolio.transaction_importer.db import get_account_by_name, get_or_create_symbol, save_transactions
-from portfolio.transaction_importer.utils import logger
+import importlib
+
+# Map each public name to the submodule that defines it. Submodules are only
+# imported on first attribute access so that, e.g., using the parsers does not
+# pull in Qt dialogs or database sessions.
+_LAZY = {
+    'main': 'portfolio.transaction_importer.main',
+    'TransactionReviewWindow': 'portfolio.transaction_importer.review_window',
+    'ColumnMapperDialog': 'portfolio.transaction_importer.column_mapper',
+    'AccountSelectionDialog': 'portfolio.transaction_importer.account_selection',
+    'TransactionTableModel': 'portfolio.transaction_importer.table_model',
+    'DateDelegate': 'portfolio.transaction_importer.delegates',
+    'ComboBoxDelegate': 'portfolio.transaction_importer.delegates',
+    'DecimalDelegate': 'portfolio.transaction_importer.delegates',
+    'JSONDelegate': 'portfolio.transaction_importer.delegates',
+    'parse_date': 'portfolio.transaction_importer.parsers',
+    'parse_decimal': 'portfolio.transaction_importer.parsers',
+    'parse_json': 'portfolio.transaction_importer.parsers',
+    'parse_option_details': 'portfolio.transaction_importer.parsers',
+    'standardize_option_transaction_type': 'portfolio.transaction_importer.parsers',
+    'calculate_amount': 'portfolio.transaction_importer.parsers',
+    'calculate_trade_amount': 'portfolio.transaction_importer.parsers',
+    'import_transactions_from_csv': 'portfolio.transaction_importer.csv_import',
+    'iter_transactions_from_csv': 'portfolio.transaction_importer.csv_import',
+    'get_account_by_name': 'portfolio.transaction_importer.db',
+    'get_or_create_symbol': 'portfolio.transaction_importer.db',
+    'save_transactions': 'portfolio.transaction_importer.db',
+    'logger': 'portfolio.transaction_importer.utils',
+}
 
 __all__ = [
     'main',
@@ -25,8 +44,26 @@ __all__ = [
     'parse_option_details',
     'standardize_option_transaction_type',
     'calculate_amount',
+    'calculate_trade_amount',
     'import_transactions_from_csv',
+    'iter_transactions_from_csv',
     'get_account_by_name',
     'get_or_create_symbol',
     'save_transactions'
 ]
+
+
+def __getattr__(name):
+    """Import the submodule defining ``name`` on first access (PEP 562)."""
+    try:
+        module_name = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
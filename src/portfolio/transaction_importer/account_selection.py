@@ -1,7 +1,8 @@
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QComboBox, QLineEdit, QPushButton, QMessageBox)
+from sqlalchemy import select
 
-from portfolio.database import SessionLocal
+from portfolio.database import get_session
 from portfolio.models import Account, User
 
 
@@ -12,6 +13,8 @@ class AccountSelectionDialog(QDialog):
         self.setWindowTitle("Select Account")
         self.resize(400, 200)
         self.selected_account = None
+        # Single session shared by all lookups and writes while the dialog is open
+        self._db = get_session()
         self._setup_ui()
         self._load_accounts()
 
@@ -29,6 +32,7 @@ class AccountSelectionDialog(QDialog):
 
         # Account dropdown
         self.account_combo = QComboBox()
+        self.account_combo.currentIndexChanged.connect(self._on_account_selected)
         layout.addWidget(self.account_combo)
 
         # Create new account option
@@ -66,25 +70,35 @@ class AccountSelectionDialog(QDialog):
 
     def _load_accounts(self):
         """Load existing accounts from the database."""
-        db = SessionLocal()
+        db = self._db
         try:
-            accounts = db.query(Account).filter(Account.is_active == True).all()
-            self.account_combo.clear()
-
-            # Add empty selection
-            self.account_combo.addItem("-- Select an account --", None)
-
-            # Add existing accounts
-            for account in accounts:
-                self.account_combo.addItem(f"{account.name} ({account.broker})", account.id)
+            # Only fetch the columns shown in the dropdown, streamed in batches
+            rows = db.execute(
+                select(Account.id, Account.name, Account.broker)
+                .where(Account.is_active.is_(True))
+                .execution_options(yield_per=1000)
+            )
+            # Empty selection followed by the existing accounts
+            items = [("-- Select an account --", None)]
+            items.extend((f"{name} ({broker})", account_id) for account_id, name, broker in rows)
+
+            # Populate the dropdown in one batch without per-item signals or repaints
+            self.account_combo.blockSignals(True)
+            self.account_combo.setUpdatesEnabled(False)
+            try:
+                self.account_combo.clear()
+                self.account_combo.addItems([text for text, _ in items])
+                for i, (_, account_id) in enumerate(items):
+                    self.account_combo.setItemData(i, account_id)
+            finally:
+                self.account_combo.setUpdatesEnabled(True)
+                self.account_combo.blockSignals(False)
 
             self.ok_button.setEnabled(False)
-            self.account_combo.currentIndexChanged.connect(self._on_account_selected)
 
         except Exception as e:
+            db.rollback()
             QMessageBox.critical(self, "Error", f"Failed to load accounts: {str(e)}")
-        finally:
-            db.close()
 
     def _on_account_selected(self, index):
         """Handle account selection from dropdown."""
@@ -110,7 +124,7 @@ class AccountSelectionDialog(QDialog):
             return
 
         # Create the new account
-        db = SessionLocal()
+        db = self._db
         try:
             # Get first user (this is a single-user application)
             user = db.query(User).first()
@@ -140,8 +154,11 @@ class AccountSelectionDialog(QDialog):
         except Exception as e:
             db.rollback()
             QMessageBox.critical(self, "Error", f"Failed to create account: {str(e)}")
-        finally:
-            db.close()
+
+    def done(self, result):
+        """Release the dialog's database session when it is accepted or rejected."""
+        self._db.close()
+        super().done(result)
 
     def get_selected_account(self):
         """Return the selected account name."""
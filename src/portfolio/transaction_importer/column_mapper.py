@@ -1,16 +1,163 @@
-import json
 import logging
 import re
+from collections import OrderedDict
+from functools import partial
+from pathlib import Path
+
+try:
+    import ahocorasick
+except ImportError:  # Optional dependency; header matching falls back to substring scans
+    ahocorasick = None
 from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                                QComboBox, QPushButton, QFileDialog,
                                QMessageBox, QScrollArea, QWidget, QTableView, QHeaderView)
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QStandardItem, QStandardItemModel
+from PySide6.QtCore import QAbstractTableModel, QSignalBlocker, Qt
+
+from portfolio.transaction_importer.utils import dump_mapping_json, load_mapping_json
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Mapping of common CSV column names to our application fields
+COMMON_PATTERNS = {
+    'date': ['date', 'transaction date', 'trade date', 'activity date', 'run date', 'open date'],
+    'symbol': ['symbol', 'ticker', 'security', 'security symbol'],
+    'action': ['action', 'activity', 'transaction type', 'type', 'description'],
+    'quantity': ['quantity', 'qty', 'shares', 'amount'],
+    'price': ['price', 'price ($)', 'price/share', 'share price'],
+    'amount': ['amount', 'amount ($)', 'value', 'total', 'net amount', 'proceeds', 'total amount'],
+    'fees': ['fees', 'commission', 'fees & comm', 'commission ($)', 'fees ($)'],
+    'account_name': ['account', 'account name', 'acct'],
+    'instrument_type': ['instrument type', 'security type', 'asset class', 'type'],
+    'notes': ['notes', 'description', 'comments', 'memo', 'memo_desc'],
+}
+
+# (pattern, field) pairs flattened in field order, so the first match for a
+# header is still the first field (in COMMON_PATTERNS order) that matches
+_PATTERN_INDEX = tuple(
+    (pattern, field) for field, patterns in COMMON_PATTERNS.items() for pattern in patterns
+)
+
+
+def _build_pattern_automaton():
+    """Build an Aho-Corasick automaton over all header patterns.
+
+    Each word maps to the (priority, field) entries using it, where priority is
+    the field's position in COMMON_PATTERNS, so a single pass over a header
+    yields every candidate field.
+    """
+    priorities = {field: i for i, field in enumerate(COMMON_PATTERNS)}
+    entries = {}
+    for pattern, field in _PATTERN_INDEX:
+        entries.setdefault(pattern, []).append((priorities[field], field))
+
+    automaton = ahocorasick.Automaton()
+    for pattern, pattern_entries in entries.items():
+        automaton.add_word(pattern, tuple(pattern_entries))
+    automaton.make_automaton()
+    return automaton
+
+
+_PATTERN_AUTOMATON = _build_pattern_automaton() if ahocorasick is not None else None
+
+# Option detection, one scan per value. Lookaheads require every condition:
+# symbols need a space, a C/P (call/put) and a digit; descriptions need an
+# option term plus a strike price or expiry date
+_OPTION_SYMBOL_RE = re.compile(r'(?=.* )(?=.*[CP])(?=.*[0-9])', re.IGNORECASE | re.DOTALL)
+_OPTION_DESCRIPTION_RE = re.compile(
+    r'(?=.*(?:call|put|option|strike|exp))(?=.*(?:\$[0-9]+|[0-9]{1,2}/[0-9]{1,2}))',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Broker export formats recognised by their header sets, with the mappings they imply
+_FIDELITY_KEYS = frozenset({'Run Date', 'Action', 'Symbol', 'Amount ($)'})
+_FIDELITY_MAPPING = {
+    'date': 'Run Date',
+    'action': 'Action',
+    'symbol': 'Symbol',
+    'amount': 'Amount ($)',
+    'quantity': 'Quantity',
+    'price': 'Price ($)',
+    'fees': 'Fees ($)'
+}
+
+# TD Ameritrade / Charles Schwab; the action is detected from the Description field
+_TDA_KEYS = frozenset({'Date', 'Symbol', 'Description', 'Quantity', 'Price', 'Amount'})
+_TDA_MAPPING = {
+    'date': 'Date',
+    'symbol': 'Symbol',
+    'quantity': 'Quantity',
+    'price': 'Price',
+    'amount': 'Amount',
+    'action': 'Description'
+}
+
+_ROBINHOOD_KEYS = frozenset({'Date', 'Symbol', 'Action', 'Quantity', 'Price', 'Fees & Comm', 'Amount'})
+_ROBINHOOD_MAPPING = {
+    'date': 'Date',
+    'symbol': 'Symbol',
+    'action': 'Action',
+    'quantity': 'Quantity',
+    'price': 'Price',
+    'fees': 'Fees & Comm',
+    'amount': 'Amount'
+}
+
+_LOT_KEYS = frozenset({'Open Date', 'Quantity', 'Price', 'Cost/Share', 'Market Value', 'Holding Period'})
+_LOT_MAPPING = {
+    'date': 'Open Date',
+    'quantity': 'Quantity',
+    'price': 'Cost/Share',  # Use cost basis as price
+    'amount': 'Market Value'
+}
+
+# Tooltips explaining each application field
+_TOOLTIPS = {
+    'date': "Transaction date in any common format (YYYY-MM-DD, MM/DD/YYYY, etc.)",
+    'symbol': "Stock ticker symbol (e.g., AAPL, MSFT)",
+    'action': "Transaction type (buy, sell, dividend, deposit, withdrawal, etc.)",
+    'quantity': "Number of shares or units",
+    'price': "Price per share/unit",
+    'amount': "Total transaction amount (or dividend amount, deposit amount, etc.)",
+    'fees': "Transaction fees or commissions",
+    'account_name': "Name of the brokerage account",
+    'instrument_type': "Type of instrument (stock, etf, option, cash)",
+    'notes': "Additional notes about the transaction",
+    'journal_details': "JSON data for transfers between accounts"
+}
+
+# Header substrings that mark a description-like column, and action words in preview values
+_DESCRIPTION_FIELDS = frozenset({'description', 'transaction description', 'security description', 'details'})
+_COMMON_ACTIONS = frozenset({'buy', 'sell', 'dividend', 'deposit', 'withdrawal'})
+
+# Detection results for recently seen CSV layouts, most recently used last
+_DETECT_CACHE = OrderedDict()
+_DETECT_CACHE_SIZE = 64
+
+
+class _PreviewModel(QAbstractTableModel):
+    """Read-only model serving preview rows straight from the parsed CSV dicts."""
+    def __init__(self, rows, headers, parent=None):
+        super().__init__(parent)
+        self._rows = rows
+        self._headers = headers
+
+    def rowCount(self, parent=None):
+        return len(self._rows)
+
+    def columnCount(self, parent=None):
+        return len(self._headers)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        # Keep the default row numbers on the vertical header
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return str(self._rows[index.row()].get(self._headers[index.column()], ''))
+
 
 class ColumnMapperDialog(QDialog):
     """Dialog for mapping CSV columns to application fields."""
@@ -18,6 +165,18 @@ class ColumnMapperDialog(QDialog):
         super().__init__(parent)
         self.csv_headers = csv_headers
         self.preview_data = preview_data[:5]  # Use first 5 rows for preview
+        # Column-major view of the preview rows for the detection passes
+        self._preview_columns = {
+            header: [row.get(header, '') for row in self.preview_data] for header in self.csv_headers
+        }
+        # Case-folded copies for the symbol and action passes; short CSV rows
+        # leave None values, which are treated as empty
+        self._preview_columns_upper = {
+            header: [(v or '').strip().upper() for v in values] for header, values in self._preview_columns.items()
+        }
+        self._preview_columns_lower = {
+            header: [(v or '').lower() for v in values] for header, values in self._preview_columns.items()
+        }
         self.column_mappings = {}
         self.required_fields = [
             'date', 'action'
@@ -37,12 +196,23 @@ class ColumnMapperDialog(QDialog):
             'fees', 'account_name', 'instrument_type', 'notes', 'journal_details'
         ]
 
+        # Per-field widgets and the last stylesheet applied to each label
+        self._field_labels = {}
+        self._field_combos = {}
+        self._last_style = {}
+
+        # Combo index of each CSV header; index 0 is the "Not Mapped" entry
+        self._header_to_index = {}
+        for i, header in enumerate(self.csv_headers, start=1):
+            self._header_to_index.setdefault(header, i)
+
         self.setWindowTitle("Map CSV Columns")
         self.resize(800, 600)
-        self._setup_ui()
+        self._body_built = False
+        self._setup_ui_skeleton()
 
-    def _setup_ui(self):
-        """Set up the UI components."""
+    def _setup_ui_skeleton(self):
+        """Set up the instructions and buttons; the mapping rows are built on first show."""
         main_layout = QVBoxLayout(self)
 
         # Instructions
@@ -52,6 +222,35 @@ class ColumnMapperDialog(QDialog):
         instructions.setWordWrap(True)
         main_layout.addWidget(instructions)
 
+        # Placeholder for the mapping rows and preview
+        self._body_layout = QVBoxLayout()
+        main_layout.addLayout(self._body_layout)
+
+        # Buttons
+        button_layout = QHBoxLayout()
+
+        # Add save/load mapping buttons
+        self.save_mapping_button = QPushButton("Save Mapping")
+        self.save_mapping_button.clicked.connect(self._save_mapping)
+        self.load_mapping_button = QPushButton("Load Mapping")
+        self.load_mapping_button.clicked.connect(self._load_mapping)
+
+        button_layout.addWidget(self.save_mapping_button)
+        button_layout.addWidget(self.load_mapping_button)
+        button_layout.addStretch()
+
+        self.ok_button = QPushButton("OK")
+        self.ok_button.clicked.connect(self.accept)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.reject)
+
+        button_layout.addWidget(self.cancel_button)
+        button_layout.addWidget(self.ok_button)
+
+        main_layout.addLayout(button_layout)
+
+    def _setup_ui_body(self):
+        """Run column detection and build the mapping rows and data preview."""
         # Create a scroll area for the mappings
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
@@ -72,23 +271,11 @@ class ColumnMapperDialog(QDialog):
             label.setMinimumWidth(150)
 
             # Add tooltips to explain each field
-            tooltips = {
-                'date': "Transaction date in any common format (YYYY-MM-DD, MM/DD/YYYY, etc.)",
-                'symbol': "Stock ticker symbol (e.g., AAPL, MSFT)",
-                'action': "Transaction type (buy, sell, dividend, deposit, withdrawal, etc.)",
-                'quantity': "Number of shares or units",
-                'price': "Price per share/unit",
-                'amount': "Total transaction amount (or dividend amount, deposit amount, etc.)",
-                'fees': "Transaction fees or commissions",
-                'account_name': "Name of the brokerage account",
-                'instrument_type': "Type of instrument (stock, etf, option, cash)",
-                'notes': "Additional notes about the transaction",
-                'journal_details': "JSON data for transfers between accounts"
-            }
-            if field in tooltips:
-                label.setToolTip(tooltips[field])
+            if field in _TOOLTIPS:
+                label.setToolTip(_TOOLTIPS[field])
 
             row_layout.addWidget(label)
+            self._field_labels[field] = label
 
             # Dropdown for selecting CSV column
             combo = QComboBox()
@@ -96,74 +283,52 @@ class ColumnMapperDialog(QDialog):
             for header in self.csv_headers:
                 combo.addItem(header, header)
 
-            # Set mapped column if one was detected
+            # Set mapped column if one was detected; the combo isn't connected yet,
+            # so this doesn't trigger _on_mapping_changed
             if field in self.column_mappings:
-                mapped_header = self.column_mappings[field]
-                idx = self.csv_headers.index(mapped_header) + 1  # +1 for "Not Mapped"
-                combo.setCurrentIndex(idx)
+                combo.setCurrentIndex(self._header_to_index[self.column_mappings[field]])
 
-            combo.currentIndexChanged.connect(lambda idx, f=field, cb=combo: self._on_mapping_changed(f, cb))
+            combo.currentIndexChanged.connect(partial(self._on_mapping_changed, field))
             row_layout.addWidget(combo)
+            self._field_combos[field] = combo
 
             scroll_layout.addLayout(row_layout)
 
         scroll_area.setWidget(scroll_widget)
-        main_layout.addWidget(scroll_area)
+        self._body_layout.addWidget(scroll_area)
 
         # Preview section
         preview_label = QLabel("Data Preview:")
         preview_label.setStyleSheet("font-weight: bold;")
-        main_layout.addWidget(preview_label)
+        self._body_layout.addWidget(preview_label)
 
         # Preview table
         preview_table = QTableView()
         preview_table.setAlternatingRowColors(True)
-        preview_model = QStandardItemModel(len(self.preview_data), len(self.csv_headers))
-
-        # Set headers
-        for i, header in enumerate(self.csv_headers):
-            preview_model.setHorizontalHeaderItem(i, QStandardItem(header))
-
-        # Set data
-        for row_idx, row in enumerate(self.preview_data):
-            for col_idx, header in enumerate(self.csv_headers):
-                item = QStandardItem(str(row.get(header, '')))
-                preview_model.setItem(row_idx, col_idx, item)
-
+        preview_model = _PreviewModel(self.preview_data, self.csv_headers, preview_table)
         preview_table.setModel(preview_model)
+        # Set resize modes last so the header isn't re-laid out per item
         preview_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        preview_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         preview_table.setMaximumHeight(200)
-        main_layout.addWidget(preview_table)
-
-        # Buttons
-        button_layout = QHBoxLayout()
-
-        # Add save/load mapping buttons
-        self.save_mapping_button = QPushButton("Save Mapping")
-        self.save_mapping_button.clicked.connect(self._save_mapping)
-        self.load_mapping_button = QPushButton("Load Mapping")
-        self.load_mapping_button.clicked.connect(self._load_mapping)
-
-        button_layout.addWidget(self.save_mapping_button)
-        button_layout.addWidget(self.load_mapping_button)
-        button_layout.addStretch()
-
-        self.ok_button = QPushButton("OK")
-        self.ok_button.clicked.connect(self.accept)
-        self.cancel_button = QPushButton("Cancel")
-        self.cancel_button.clicked.connect(self.reject)
-
-        button_layout.addWidget(self.cancel_button)
-        button_layout.addWidget(self.ok_button)
-
-        main_layout.addLayout(button_layout)
+        self._body_layout.addWidget(preview_table)
 
         # Check initial mappings
         self._validate_mappings()
 
-    def _on_mapping_changed(self, field, combo_box):
+    def _ensure_body_built(self):
+        """Build the dialog body if it hasn't been built yet."""
+        if not self._body_built:
+            self._body_built = True
+            self._setup_ui_body()
+
+    def showEvent(self, event):
+        self._ensure_body_built()
+        super().showEvent(event)
+
+    def _on_mapping_changed(self, field, index):
         """Handle changes to the column mapping."""
-        selected_value = combo_box.currentData()
+        selected_value = self._field_combos[field].itemData(index)
 
         if selected_value:
             self.column_mappings[field] = selected_value
@@ -177,23 +342,25 @@ class ColumnMapperDialog(QDialog):
         # Check that all required fields are mapped
         missing_required = [f for f in self.required_fields if f not in self.column_mappings]
 
-        # Highlight missing required fields
-        labels = self.findChildren(QLabel)
-        for label in labels:
-            text = label.text().rstrip(':*')
-            if text in self.all_possible_fields:
-                if text in missing_required:
-                    label.setStyleSheet("color: red; font-weight: bold;")
-                elif text in self.required_fields:
-                    label.setStyleSheet("color: black; font-weight: bold;")
-                else:
-                    label.setStyleSheet("color: black; font-weight: normal;")
+        # Highlight missing required fields, restyling only labels whose style changed
+        for field, label in self._field_labels.items():
+            if field in missing_required:
+                style = "color: red; font-weight: bold;"
+            elif field in self.required_fields:
+                style = "color: black; font-weight: bold;"
+            else:
+                style = "color: black; font-weight: normal;"
+
+            if self._last_style.get(field) != style:
+                label.setStyleSheet(style)
+                self._last_style[field] = style
 
         # Enable/disable OK button based on validation
         self.ok_button.setEnabled(len(missing_required) == 0)
 
     def get_mappings(self):
         """Return the column mappings."""
+        self._ensure_body_built()
         return self.column_mappings
 
     def _save_mapping(self):
@@ -214,8 +381,7 @@ class ColumnMapperDialog(QDialog):
             filepath += '.json'
 
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.column_mappings, f, indent=2)
+            Path(filepath).write_bytes(dump_mapping_json(self.column_mappings))
             QMessageBox.information(self, "Success", "Mapping saved successfully.")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save mapping: {str(e)}")
@@ -230,15 +396,15 @@ class ColumnMapperDialog(QDialog):
             return
 
         try:
-            with open(filepath, 'r') as f:
-                mappings = json.load(f)
+            mappings = load_mapping_json(Path(filepath).read_bytes())
 
             # Validate mappings
             if not isinstance(mappings, dict):
                 raise ValueError("Invalid mapping format")
 
             # Check that mapped columns exist in the CSV
-            missing_cols = [col for col in mappings.values() if col not in self.csv_headers]
+            header_set = set(self.csv_headers)
+            missing_cols = [col for col in mappings.values() if col not in header_set]
             if missing_cols:
                 QMessageBox.warning(
                     self, "Warning",
@@ -247,7 +413,7 @@ class ColumnMapperDialog(QDialog):
                 )
 
             # Update mappings, ignoring those with missing columns
-            valid_mappings = {k: v for k, v in mappings.items() if v in self.csv_headers}
+            valid_mappings = {k: v for k, v in mappings.items() if v in header_set}
             self.column_mappings = valid_mappings
 
             # Update UI to reflect loaded mappings
@@ -260,45 +426,28 @@ class ColumnMapperDialog(QDialog):
 
     def _update_ui_from_mappings(self):
         """Update the UI dropdowns to reflect the current mappings."""
-        # Find all QComboBox widgets in our scroll area
-        combo_boxes = self.findChildren(QComboBox)
-
-        for combo in combo_boxes:
-            # Get the field name from the parent layout's first widget (label)
-            parent_layout = combo.parent().layout()
-            if parent_layout and parent_layout.count() > 0:
-                label_widget = parent_layout.itemAt(0).widget()
-                if isinstance(label_widget, QLabel):
-                    # Extract field name from label text (remove trailing colon and asterisk)
-                    field_text = label_widget.text().rstrip(':*')
-
-                    # If this field is in our mappings, update the combo box
-                    if field_text in self.column_mappings:
-                        mapped_col = self.column_mappings[field_text]
-                        # Find the index of this column in the combo box
-                        for i in range(combo.count()):
-                            if combo.itemData(i) == mapped_col:
-                                combo.setCurrentIndex(i)
-                                break
+        for field, combo in self._field_combos.items():
+            # Unmapped fields go back to "Not Mapped"
+            header = self.column_mappings.get(field)
+            index = self._header_to_index.get(header, 0)
+            if combo.currentIndex() == index:
+                continue
+
+            # Block signals so _on_mapping_changed doesn't revalidate per combo
+            with QSignalBlocker(combo):
+                combo.setCurrentIndex(index)
 
         # Validate the mappings after updating
         self._validate_mappings()
 
     def _detect_special_formats(self):
         """Detect special CSV formats from common brokers."""
+        header_set = frozenset(self.csv_headers)
+
         # Check for Fidelity format
-        fidelity_headers = ['Run Date', 'Action', 'Symbol', 'Description', 'Quantity', 'Price ($)', 'Commission ($)', 'Fees ($)', 'Accrued Interest ($)', 'Amount ($)', 'Settlement Date']
-        if all(h in self.csv_headers for h in ['Run Date', 'Action', 'Symbol', 'Amount ($)']):
+        if _FIDELITY_KEYS <= header_set:
             # This looks like a Fidelity export
-            self.column_mappings.update({
-                'date': 'Run Date',
-                'action': 'Action',
-                'symbol': 'Symbol',
-                'amount': 'Amount ($)',
-                'quantity': 'Quantity',
-                'price': 'Price ($)',
-                'fees': 'Fees ($)'
-            })
+            self.column_mappings.update(_FIDELITY_MAPPING)
             # Try to detect account name from the filename or data
             if not self.column_mappings.get('account_name'):
                 self.column_mappings['account_name'] = 'Description'  # Use Description as fallback
@@ -309,17 +458,9 @@ class ColumnMapperDialog(QDialog):
                 pass
 
         # Check for TD Ameritrade / Charles Schwab format
-        if all(h in self.csv_headers for h in ['Date', 'Symbol', 'Description', 'Quantity', 'Price', 'Amount']):
+        if _TDA_KEYS <= header_set:
             # This looks like a TD Ameritrade or Schwab export
-            self.column_mappings.update({
-                'date': 'Date',
-                'symbol': 'Symbol',
-                'quantity': 'Quantity',
-                'price': 'Price',
-                'amount': 'Amount'
-            })
-            # Try to detect action from Description field
-            self.column_mappings['action'] = 'Description'
+            self.column_mappings.update(_TDA_MAPPING)
 
             # Add account_name default if not present
             if 'account_name' not in self.column_mappings:
@@ -327,31 +468,18 @@ class ColumnMapperDialog(QDialog):
                 pass
 
         # Check for Robinhood format (buy/sell transactions)
-        if all(h in self.csv_headers for h in ['Date', 'Symbol', 'Action', 'Quantity', 'Price', 'Fees & Comm', 'Amount']):
+        if _ROBINHOOD_KEYS <= header_set:
             # This looks like a Robinhood export
-            self.column_mappings.update({
-                'date': 'Date',
-                'symbol': 'Symbol',
-                'action': 'Action',
-                'quantity': 'Quantity',
-                'price': 'Price',
-                'fees': 'Fees & Comm',
-                'amount': 'Amount'
-            })
+            self.column_mappings.update(_ROBINHOOD_MAPPING)
             # Add account_name default if not present
             if 'account_name' not in self.column_mappings:
                 # Will need manual mapping
                 pass
 
         # Check for AAPL Lot Details format (example 3)
-        if all(h in self.csv_headers for h in ['Open Date', 'Quantity', 'Price', 'Cost/Share', 'Market Value', 'Holding Period']):
+        if _LOT_KEYS <= header_set:
             # This looks like a lot details export
-            self.column_mappings.update({
-                'date': 'Open Date',
-                'quantity': 'Quantity',
-                'price': 'Cost/Share',  # Use cost basis as price
-                'amount': 'Market Value'
-            })
+            self.column_mappings.update(_LOT_MAPPING)
             # Since this is position data not transactions, we need special handling
             # Default to 'buy' action
             if 'action' not in self.column_mappings:
@@ -368,50 +496,73 @@ class ColumnMapperDialog(QDialog):
                             self.column_mappings['symbol'] = header
                             break
 
+    def _match_header_field(self, header_lower):
+        """Return the first unmapped field whose patterns occur in the header, if any."""
+        if _PATTERN_AUTOMATON is not None:
+            candidates = sorted({
+                entry for _, entries in _PATTERN_AUTOMATON.iter(header_lower) for entry in entries
+            })
+            return next((field for _, field in candidates if field not in self.column_mappings), None)
+
+        for pattern, app_field in _PATTERN_INDEX:
+            if app_field not in self.column_mappings and pattern in header_lower:
+                return app_field
+        return None
+
+    def _detect_cache_key(self):
+        """Build a hashable key from the headers and every preview value detection can read."""
+        rows = tuple(
+            tuple((key, tuple(value) if isinstance(value, list) else value) for key, value in row.items())
+            for row in self.preview_data
+        )
+        return tuple(self.csv_headers), rows
+
     def _detect_column_patterns(self):
-        """Attempt to detect common patterns in CSV headers and map them to application fields."""
-        # Mapping of common CSV column names to our application fields
-        common_patterns = {
-            'date': ['date', 'transaction date', 'trade date', 'activity date', 'run date', 'open date'],
-            'symbol': ['symbol', 'ticker', 'security', 'security symbol'],
-            'action': ['action', 'activity', 'transaction type', 'type', 'description'],
-            'quantity': ['quantity', 'qty', 'shares', 'amount'],
-            'price': ['price', 'price ($)', 'price/share', 'share price'],
-            'amount': ['amount', 'amount ($)', 'value', 'total', 'net amount', 'proceeds', 'total amount'],
-            'fees': ['fees', 'commission', 'fees & comm', 'commission ($)', 'fees ($)'],
-            'account_name': ['account', 'account name', 'acct'],
-            'instrument_type': ['instrument type', 'security type', 'asset class', 'type'],
-            'notes': ['notes', 'description', 'comments', 'memo', 'memo_desc'],
-        }
+        """Detect column mappings, reusing the result for a previously seen CSV layout."""
+        key = self._detect_cache_key()
+        cached = _DETECT_CACHE.get(key)
+        if cached is None:
+            options_detected = self._detect_column_patterns_uncached()
+            _DETECT_CACHE[key] = (dict(self.column_mappings), options_detected)
+            if len(_DETECT_CACHE) > _DETECT_CACHE_SIZE:
+                _DETECT_CACHE.popitem(last=False)
+            return
 
+        _DETECT_CACHE.move_to_end(key)
+        mappings, options_detected = cached
+        self.column_mappings = dict(mappings)
+        if options_detected:
+            logger.info("Detected options data in the CSV. Will auto-detect options.")
+
+    def _detect_column_patterns_uncached(self):
+        """Attempt to detect common patterns in CSV headers and map them to application fields.
+
+        Returns True if option data was detected.
+        """
         # Check for description-like fields that could contain option information
-        description_fields = ['description', 'transaction description', 'security description', 'details']
         notes_mapped = False
-        for header in self.csv_headers:
-            if any(pattern in header.lower() for pattern in description_fields):
+        headers_lower = [header.lower() for header in self.csv_headers]
+        for header, header_lower in zip(self.csv_headers, headers_lower):
+            if any(pattern in header_lower for pattern in _DESCRIPTION_FIELDS):
                 if 'notes' not in self.column_mappings:
                     self.column_mappings['notes'] = header
                     notes_mapped = True
                     break
 
         # For each CSV header, check if it matches any of our patterns
-        for header in self.csv_headers:
-            header_lower = header.lower()
-
+        for header, header_lower in zip(self.csv_headers, headers_lower):
             # Skip headers that look like metadata or instructions
             if header_lower.startswith('"') or len(header_lower) > 50:
                 continue
 
-            # Try to match with our application fields
-            for app_field, patterns in common_patterns.items():
-                if any(pattern in header_lower for pattern in patterns):
-                    # Check if we already have a mapping for this field
-                    if app_field not in self.column_mappings:
-                        self.column_mappings[app_field] = header
-                        break
+            # Map the header to the first unmapped field with a matching pattern
+            app_field = self._match_header_field(header_lower)
+            if app_field is not None:
+                self.column_mappings[app_field] = header
 
         # Additional detection for specific file formats based on preview data
         # Try to determine what type of transactions these are and make intelligent guesses
+        mapped = set(self.column_mappings.values())
 
         # If we have action column but need to map symbol
         if 'action' in self.column_mappings and 'symbol' not in self.column_mappings:
@@ -420,14 +571,15 @@ class ColumnMapperDialog(QDialog):
             # Look for a column that might contain symbols
             for header in self.csv_headers:
                 # Skip already mapped columns
-                if header in self.column_mappings.values():
+                if header in mapped:
                     continue
 
                 # Check preview data for this column
-                values = [row.get(header, '').strip().upper() for row in self.preview_data]
+                values = self._preview_columns_upper[header]
                 # Look for typical stock symbols (all caps, 1-5 letters)
                 if any(v and v.isalpha() and 1 <= len(v) <= 5 for v in values):
                     self.column_mappings['symbol'] = header
+                    mapped.add(header)
                     break
 
         # If we have detected date column, try to intelligently map action
@@ -435,15 +587,15 @@ class ColumnMapperDialog(QDialog):
             # Look for columns with values like "BUY", "SELL", "DIVIDEND", etc.
             for header in self.csv_headers:
                 # Skip already mapped columns
-                if header in self.column_mappings.values():
+                if header in mapped:
                     continue
 
                 # Check preview data for this column
-                values = [row.get(header, '').lower() for row in self.preview_data]
+                values = self._preview_columns_lower[header]
                 # Look for common transaction types
-                common_actions = ['buy', 'sell', 'dividend', 'deposit', 'withdrawal']
-                if any(any(action in v for action in common_actions) for v in values):
+                if any(any(action in v for action in _COMMON_ACTIONS) for v in values):
                     self.column_mappings['action'] = header
+                    mapped.add(header)
                     break
 
         # Look for option data in preview
@@ -452,32 +604,33 @@ class ColumnMapperDialog(QDialog):
         # Check mapped symbol column for option indicators
         if 'symbol' in self.column_mappings:
             symbol_col = self.column_mappings['symbol']
-            symbols = [row.get(symbol_col, '') for row in self.preview_data if row.get(symbol_col, '')]
+            symbols = [v for v in self._preview_columns[symbol_col] if v]
 
             # Look for option patterns in symbols
             for symbol in symbols:
-                if ' ' in symbol and any(x in symbol.upper() for x in ['CALL', 'PUT', 'C', 'P']) and re.search(r'[0-9]', symbol):
+                if _OPTION_SYMBOL_RE.match(symbol):
                     found_options = True
                     break
 
         # Check description/notes column for option indicators if we have one
         if 'notes' in self.column_mappings and not found_options:
             notes_col = self.column_mappings['notes']
-            descriptions = [row.get(notes_col, '') for row in self.preview_data if row.get(notes_col, '')]
+            descriptions = [v for v in self._preview_columns[notes_col] if v]
 
-            # Look for option-related terms
-            option_terms = ['call', 'put', 'option', 'strike', 'exp', 'expiry', 'expiration']
+            # Look for option-related terms alongside a strike price or date
             for desc in descriptions:
-                desc_lower = desc.lower()
-                if any(term in desc_lower for term in option_terms) and re.search(r'\$[0-9]+|[0-9]{1,2}/[0-9]{1,2}', desc):
+                if _OPTION_DESCRIPTION_RE.match(desc):
                     found_options = True
                     break
 
         # If we found options and instrument_type isn't mapped, map to a default field
-        if found_options and 'instrument_type' not in self.column_mappings:
+        options_detected = found_options and 'instrument_type' not in self.column_mappings
+        if options_detected:
             # We'll use this as a signal to automatically detect options
             # The actual parsing is done in import_transactions_from_csv
             logger.info("Detected options data in the CSV. Will auto-detect options.")
 
         # Special case detection for common broker formats
         self._detect_special_formats()
+
+        return options_detected
@@ -1,128 +1,177 @@
 import csv
+import re
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from portfolio.models import InstrumentType, TransactionType
+from portfolio.models import INSTRUMENT_TYPE_BY_VALUE, InstrumentType, TransactionType
 from portfolio.transaction_importer.parsers import (
-    parse_date, parse_decimal, parse_json, parse_option_details,
-    standardize_option_transaction_type, calculate_amount
+    detect_date_format, parse_date, parse_date_as, parse_decimal, parse_json, parse_option_details,
+    standardize_option_transaction_type, calculate_trade_amount, TRADE_FEE_SIGNS
 )
 
+# Read buffer for full imports; fewer read syscalls on large files
+READ_BUFFER_SIZE = 1 << 20
 
-def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
-    """Parse CSV file into a list of transaction dictionaries.
+# Shared zero for default fees and expired options; Decimal is immutable
+_ZERO = Decimal(0)
+
+# Action text that marks an option transaction, and expired/worthless options
+_OPTION_ACTION_RE = re.compile(r'call|put|option|bto|sto|btc|stc|exercise|assign')
+_EXPIRED_ACTION_RE = re.compile(r'expir|worthless')
+
+# Transaction types that don't need a symbol, that need quantity and price,
+# and cash movements that need an explicit amount
+_NO_SYMBOL_TYPES = frozenset({
+    TransactionType.DEPOSIT, TransactionType.WITHDRAWAL, TransactionType.FEE, TransactionType.INTEREST
+})
+_BUY_SELL_TYPES = frozenset({TransactionType.BUY, TransactionType.SELL})
+_CASH_TYPES = frozenset({TransactionType.DEPOSIT, TransactionType.WITHDRAWAL, TransactionType.FEE})
+
+
+def _row_to_dict(headers: List[str], row: List[Optional[str]]) -> Dict[Optional[str], Any]:
+    """Build the dict csv.DictReader would produce for a row."""
+    row_dict = dict(zip(headers, row))
+    if len(row) > len(headers):
+        # DictReader collects extra fields under a None key
+        row_dict[None] = row[len(headers):]
+    return row_dict
+
+
+def iter_transactions_from_csv(filepath: str, column_mappings: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+    """Parse a CSV file lazily, yielding one transaction dictionary per row.
+
+    Rows are read and parsed as the caller iterates, so memory use doesn't grow
+    with the file size.
 
     Args:
         filepath: Path to the CSV file
-        column_mappings: Optional dictionary mapping application fields to CSV column names
+        column_mappings: Dictionary mapping application fields to CSV column names
     """
     try:
-        # First load CSV to determine headers if mappings not provided
-        with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            headers = reader.fieldnames if reader.fieldnames else []
-
-            # If no column mappings provided, return first few rows for preview
-            if column_mappings is None:
-                preview_data = []
-                for i, row in enumerate(reader):
-                    if i >= 10:  # Limit to 10 rows for preview
-                        break
-                    preview_data.append(dict(row))
-                return headers, preview_data
-
-        # Process with provided column mappings
-        transactions = []
-        with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
+        # Read in a single pass, in large chunks
+        with open(filepath, 'r', newline='', encoding='utf-8-sig', buffering=READ_BUFFER_SIZE) as f:
+            reader = csv.reader(f)
+            headers = next(reader, None) or []
 
             # Check that all mapped columns exist in the CSV
             for app_field, csv_col in column_mappings.items():
                 if csv_col not in headers:
                     raise ValueError(f"Mapped column '{csv_col}' not found in CSV headers")
 
-            # Process each row
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header row
-                # Create a new transaction with original data and placeholders for errors
+            # Every row would be invalid without these, so fail before reading any.
+            # The account may be left unmapped and supplied for all rows afterwards.
+            if not column_mappings.get('date'):
+                raise ValueError("Date field is required but not mapped")
+            if not column_mappings.get('action'):
+                raise ValueError("Action field is required but not mapped")
+
+            # Resolve mapped columns to row positions once; as with DictReader,
+            # the last of any duplicate headers wins
+            column_index = {header: i for i, header in enumerate(headers)}
+
+            def mapped_index(app_field):
+                csv_col = column_mappings.get(app_field)
+                return column_index[csv_col] if csv_col else None
+
+            date_column = mapped_index('date')
+            action_column = mapped_index('action')
+            quantity_column = mapped_index('quantity')
+            account_column = mapped_index('account_name')
+            symbol_column = mapped_index('symbol')
+            description_column = mapped_index('notes')
+            instr_type_column = mapped_index('instrument_type')
+            price_column = mapped_index('price')
+            fees_column = mapped_index('fees')
+            journal_column = mapped_index('journal_details')
+            notes_column = mapped_index('notes')
+            amount_column = mapped_index('amount')
+            header_count = len(headers)
+            _strip = str.strip
+            date_format = None
+
+            # Process each row, skipping blank lines as DictReader does so they
+            # don't count towards row_num
+            rows = (row for row in reader if row)
+            for row_num, row in enumerate(rows, start=2):  # Start at 2 to account for header row
+                # Pad short rows with None, like DictReader's default restval
+                if len(row) < header_count:
+                    row += [None] * (header_count - len(row))
+
+                # Create a new transaction with placeholders for errors
                 transaction = {
                     'row_num': row_num,
                     'errors': [],
                     'warnings': [],
-                    'original': dict(row),
+                    # Set once option details are parsed, so saving needn't re-derive it
+                    '_is_option': False,
                 }
 
-                # Process date field
-                date_column = column_mappings.get('date')
-                if date_column and date_column in row:
+                # Process date field; files use one date format throughout, so apply
+                # the detected one directly and only fall back to parse_date when it doesn't fit
+                trans_date = None
+                if date_format is not None:
+                    trans_date = parse_date_as(row[date_column], date_format)
+                if trans_date is None:
                     trans_date = parse_date(row[date_column])
-                    if trans_date:
-                        transaction['transaction_date'] = trans_date
-                    else:
-                        transaction['errors'].append(f"Invalid date format: {row[date_column]}")
+                    if trans_date and date_format is None:
+                        date_format = detect_date_format(row[date_column])
+                if trans_date:
+                    transaction['transaction_date'] = trans_date
                 else:
-                    transaction['errors'].append("Date field is required but not mapped")
+                    transaction['errors'].append(f"Invalid date format: {row[date_column]}")
 
                 # Process action/transaction type
-                action_column = column_mappings.get('action')
-                if action_column and action_column in row:
-                    original_action = row[action_column].strip()
-                    action = original_action.lower()
-
-                    # Determine if this is an option transaction based on the action text
-                    # or if we've already detected option details
-                    is_option_transaction = False
-                    option_indicators = ['call', 'put', 'option', 'bto', 'sto', 'btc', 'stc', 'exercise', 'assign']
-
-                    if any(indicator in action for indicator in option_indicators) or transaction.get('instrument_type') == InstrumentType.OPTION:
-                        is_option_transaction = True
-                        transaction['instrument_type'] = InstrumentType.OPTION
+                original_action = _strip(row[action_column])
+                action = original_action.lower()
 
-                    # For expired options, set price and amount to zero
-                    if 'expir' in action or 'worthless' in action:
-                        transaction['price'] = Decimal('0')
-                        transaction['amount'] = Decimal('0')
-
-                    # Process quantity early if needed for transaction type determination
-                    quantity_column = column_mappings.get('quantity')
-                    if quantity_column and quantity_column in row:
-                        transaction['quantity'] = parse_decimal(row[quantity_column])
-
-                    # Extract broker from account name if available
-                    broker = None
-                    account_column = column_mappings.get('account_name')
-                    if account_column and account_column in row and row[account_column].strip():
-                        # Try to extract broker from account name (common format: "Account Name (Broker)")
-                        account_name = row[account_column].strip()
-                        if '(' in account_name and ')' in account_name:
-                            broker = account_name.split('(')[-1].split(')')[0]
-
-                    # Use the standardization function to get the correct transaction type
-                    try:
-                        transaction['transaction_type'] = standardize_option_transaction_type(
-                            action, 
-                            is_option_transaction,
-                            transaction.get('quantity'),
-                            broker
-                        )
-                    except Exception as e:
-                        # If standardization fails, log the error and store the original action
-                        transaction['errors'].append(f"Could not determine transaction type: {original_action}")
-                        transaction['transaction_type_str'] = original_action
-                else:
-                    transaction['errors'].append("Action field is required but not mapped")
+                # Determine if this is an option transaction based on the action text
+                # or if we've already detected option details
+                is_option_transaction = False
 
-                # Process symbol and description to check for options
-                symbol_column = column_mappings.get('symbol')
-                description_column = column_mappings.get('notes')
+                if _OPTION_ACTION_RE.search(action) or transaction.get('instrument_type') == InstrumentType.OPTION:
+                    is_option_transaction = True
+                    transaction['instrument_type'] = InstrumentType.OPTION
+
+                # For expired options, set price and amount to zero
+                if _EXPIRED_ACTION_RE.search(action):
+                    transaction['price'] = _ZERO
+                    transaction['amount'] = _ZERO
 
+                # Process quantity early if needed for transaction type determination
+                if quantity_column is not None:
+                    transaction['quantity'] = parse_decimal(row[quantity_column])
+
+                # Extract broker from account name if available
+                broker = None
+                if account_column is not None and row[account_column]:
+                    # Try to extract broker from account name (common format: "Account Name (Broker)")
+                    account_name = _strip(row[account_column])
+                    if '(' in account_name and ')' in account_name:
+                        broker = account_name.split('(')[-1].split(')')[0]
+
+                # Use the standardization function to get the correct transaction type
+                try:
+                    transaction['transaction_type'] = standardize_option_transaction_type(
+                        action, 
+                        is_option_transaction,
+                        transaction.get('quantity'),
+                        broker
+                    )
+                except Exception as e:
+                    # If standardization fails, log the error and store the original action
+                    transaction['errors'].append(f"Could not determine transaction type: {original_action}")
+                    transaction['transaction_type_str'] = original_action
+
+                # Process symbol and description to check for options
                 symbol = ""
                 description = ""
 
-                if symbol_column and symbol_column in row:
-                    symbol = row[symbol_column].strip().upper()
+                # Blank cells are common; only strip the ones with content
+                if symbol_column is not None and row[symbol_column]:
+                    symbol = _strip(row[symbol_column]).upper()
 
-                if description_column and description_column in row:
-                    description = row[description_column].strip()
+                if description_column is not None and row[description_column]:
+                    description = _strip(row[description_column])
 
                 # Store the original symbol
                 transaction['symbol'] = symbol
@@ -135,6 +184,7 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                     if option_details['is_option']:
                         # Set instrument type to OPTION
                         transaction['instrument_type'] = InstrumentType.OPTION
+                        transaction['_is_option'] = True
 
                         # Set option-specific fields
                         transaction['symbol'] = option_details['ticker']
@@ -150,17 +200,17 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                 # If symbol is still missing for relevant transaction types, add a warning
                 if not transaction.get('symbol') and 'transaction_type' in transaction:
                     ttype = transaction['transaction_type']
-                    if ttype not in [TransactionType.DEPOSIT, TransactionType.WITHDRAWAL, TransactionType.FEE, TransactionType.INTEREST]:
+                    if ttype not in _NO_SYMBOL_TYPES:
                         transaction['warnings'].append("Symbol is recommended for this transaction type but not mapped")
 
                 # Process instrument type
-                instr_type_column = column_mappings.get('instrument_type')
-                if instr_type_column and instr_type_column in row:
-                    instr_type = row[instr_type_column].lower().strip()
+                if instr_type_column is not None:
+                    instr_type = _strip(row[instr_type_column].lower())
                     if instr_type:
-                        try:
-                            transaction['instrument_type'] = InstrumentType(instr_type)
-                        except ValueError:
+                        instrument_type = INSTRUMENT_TYPE_BY_VALUE.get(instr_type)
+                        if instrument_type is not None:
+                            transaction['instrument_type'] = instrument_type
+                        else:
                             transaction['errors'].append(f"Invalid instrument type: {instr_type}")
                             transaction['instrument_type_str'] = instr_type
                 elif transaction.get('symbol'):  # Only require instrument type if symbol is provided
@@ -169,9 +219,8 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                     transaction['warnings'].append("Instrument type not provided, defaulting to 'stock'")
 
                 # Process account name
-                account_column = column_mappings.get('account_name')
-                if account_column and account_column in row:
-                    transaction['account_name'] = row[account_column].strip()
+                if account_column is not None:
+                    transaction['account_name'] = _strip(row[account_column])
                     if not transaction['account_name']:
                         transaction['errors'].append("Account name is empty")
                 else:
@@ -179,24 +228,21 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
 
                 # Skip quantity parsing as it's already done above for transaction type detection
                 # Just ensure it's correctly set
-                if 'quantity' not in transaction and column_mappings.get('quantity') in row:
-                    quantity_column = column_mappings.get('quantity')
+                if 'quantity' not in transaction and quantity_column is not None:
                     transaction['quantity'] = parse_decimal(row[quantity_column])
 
-                price_column = column_mappings.get('price')
-                if price_column and price_column in row:
+                if price_column is not None:
                     transaction['price'] = parse_decimal(row[price_column])
 
-                fees_column = column_mappings.get('fees')
-                if fees_column and fees_column in row:
-                    transaction['fees'] = parse_decimal(row[fees_column] or '0')
+                if fees_column is not None:
+                    fees = row[fees_column]
+                    transaction['fees'] = parse_decimal(fees) if fees else _ZERO
                 else:
                     # Default fees to 0 if not provided
-                    transaction['fees'] = Decimal('0')
+                    transaction['fees'] = _ZERO
 
                 # Process journal details (optional JSON)
-                journal_column = column_mappings.get('journal_details')
-                if journal_column and journal_column in row and row[journal_column].strip():
+                if journal_column is not None and row[journal_column] and _strip(row[journal_column]):
                     journal_details = parse_json(row[journal_column])
                     if journal_details:
                         transaction['journal_details'] = journal_details
@@ -205,26 +251,23 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                         transaction['journal_details_str'] = row[journal_column]
 
                 # Process notes
-                notes_column = column_mappings.get('notes')
-                if notes_column and notes_column in row:
-                    transaction['notes'] = row[notes_column].strip()
+                if notes_column is not None:
+                    transaction['notes'] = _strip(row[notes_column])
 
                 # Process amount or calculate it
-                amount_column = column_mappings.get('amount')
-                if amount_column and amount_column in row:
+                if amount_column is not None:
                     explicit_amount = parse_decimal(row[amount_column])
                     if explicit_amount is not None:
                         transaction['amount'] = explicit_amount
 
                 # If amount not explicitly provided, try to calculate
                 if 'amount' not in transaction and 'transaction_type' in transaction:
-                    action = transaction['transaction_type'].value
                     # Try to calculate amount from quantity, price, and fees
-                    calculated_amount = calculate_amount(
+                    calculated_amount = calculate_trade_amount(
                         transaction.get('quantity'), 
                         transaction.get('price'),
                         transaction.get('fees'),
-                        action
+                        TRADE_FEE_SIGNS.get(transaction['transaction_type'], 0)
                     )
                     if calculated_amount is not None:
                         transaction['amount'] = calculated_amount
@@ -232,12 +275,12 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                 # Validate required fields based on transaction type
                 if 'transaction_type' in transaction:
                     ttype = transaction['transaction_type']
-                    if ttype in [TransactionType.BUY, TransactionType.SELL]:
+                    if ttype in _BUY_SELL_TYPES:
                         if transaction.get('quantity') is None:
                             transaction['errors'].append("Quantity is required for buy/sell transactions")
                         if transaction.get('price') is None:
                             transaction['errors'].append("Price is required for buy/sell transactions")
-                    elif ttype in [TransactionType.DEPOSIT, TransactionType.WITHDRAWAL, TransactionType.FEE]:
+                    elif ttype in _CASH_TYPES:
                         if transaction.get('amount') is None:
                             transaction['errors'].append("Amount is required for cash transactions")
 
@@ -245,9 +288,45 @@ def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[s
                     if 'amount' not in transaction:
                         transaction['errors'].append("Cannot determine transaction amount")
 
-                transactions.append(transaction)
+                # Keep the original row data only for rows that need attention
+                if transaction['errors'] or transaction['warnings']:
+                    transaction['original'] = _row_to_dict(headers, row)
+
+                yield transaction
+
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {filepath}")
+    except Exception as e:
+        raise ValueError(f"Error parsing CSV: {str(e)}")
+
+
+def import_transactions_from_csv(filepath: str, column_mappings: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """Parse CSV file into a list of transaction dictionaries.
+
+    Without column mappings, returns the headers and the first rows for preview
+    instead. See iter_transactions_from_csv to process a file without holding
+    every transaction in memory.
+
+    Args:
+        filepath: Path to the CSV file
+        column_mappings: Optional dictionary mapping application fields to CSV column names
+    """
+    # Process with provided column mappings; the generator reports its own errors
+    if column_mappings is not None:
+        return list(iter_transactions_from_csv(filepath, column_mappings))
+
+    try:
+        # If no column mappings provided, return headers and first few rows for preview
+        with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            headers = reader.fieldnames if reader.fieldnames else []
 
-            return transactions
+            preview_data = []
+            for i, row in enumerate(reader):
+                if i >= 10:  # Limit to 10 rows for preview
+                    break
+                preview_data.append(dict(row))
+            return headers, preview_data
 
     except FileNotFoundError:
         raise FileNotFoundError(f"File not found: {filepath}")
@@ -1,22 +1,57 @@
+import io
+import uuid
+from itertools import islice
+from datetime import date
 from decimal import Decimal, InvalidOperation
-from typing import Any, Dict, List, Optional
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
 
-from portfolio.database import SessionLocal
-from portfolio.models import Account, Symbol, Transaction, InstrumentType, OptionType
+from portfolio.database import get_session
+from portfolio.models import OPTION_TYPE_BY_VALUE, Account, Symbol, Transaction, InstrumentType, OptionType
 from portfolio.transaction_importer.utils import logger
 
+# Imports with at least this many rows are loaded with PostgreSQL COPY;
+# smaller ones use a bulk INSERT
+COPY_THRESHOLD = 100
+
+# Transactions are written to the database this many at a time
+SAVE_BATCH_SIZE = 10_000
+
+# Column order of the COPY payload
+COPY_COLUMNS = (
+    'id', 'account_id', 'symbol_id', 'transaction_type', 'transaction_date',
+    'quantity', 'price', 'amount', 'fees', 'notes', 'related_transaction_id',
+    'created_at', 'updated_at',
+)
+
+# Default fees for transactions without any; Decimal is immutable so one instance is shared
+_ZERO = Decimal(0)
+
 
 def get_account_by_name(db: Session, account_name: str) -> Optional[Account]:
     """Find account by name."""
     return db.query(Account).filter(Account.name == account_name).first()
 
 
-def get_or_create_symbol(db: Session, ticker: str, instrument_type: InstrumentType, 
-                       option_type=None, expiration_date=None, 
-                       strike_price=None) -> Symbol:
-    """Find or create a symbol record."""
+def get_accounts_by_name(db: Session, account_names: Iterable[str]) -> Dict[str, Account]:
+    """Find many accounts by name with a single query."""
+    names = set(account_names)
+    if not names:
+        return {}
+    return {account.name: account for account in db.query(Account).filter(Account.name.in_(names))}
+
+
+SymbolKey = Tuple[str, InstrumentType, Optional[OptionType], Optional[date], Optional[Decimal]]
+
+
+def _normalize_symbol_key(ticker: str, instrument_type: InstrumentType,
+                          option_type=None, expiration_date=None,
+                          strike_price=None) -> SymbolKey:
+    """Normalize symbol attributes into a lookup key, applying option defaults."""
     # Handle missing data for options
     if instrument_type == InstrumentType.OPTION:
         if not ticker:
@@ -24,11 +59,8 @@ def get_or_create_symbol(db: Session, ticker: str, instrument_type: InstrumentTy
 
         # If option_type is a string, convert to enum
         if isinstance(option_type, str):
-            try:
-                option_type = OptionType(option_type.lower())
-            except ValueError:
-                # Default to CALL if can't determine
-                option_type = OptionType.CALL
+            # Default to CALL if can't determine
+            option_type = OPTION_TYPE_BY_VALUE.get(option_type.lower(), OptionType.CALL)
 
         # If option_type is not set, default to CALL
         if not option_type:
@@ -41,100 +73,248 @@ def get_or_create_symbol(db: Session, ticker: str, instrument_type: InstrumentTy
             except (InvalidOperation, ValueError):
                 raise ValueError(f"Invalid strike price: {strike_price}")
 
-    # Build the query
-    query = db.query(Symbol).filter(
-        Symbol.ticker == ticker,
-        Symbol.instrument_type == instrument_type
-    )
+    return ticker, instrument_type, option_type, expiration_date, strike_price
+
+
+def _symbol_matches(key: SymbolKey, symbol) -> bool:
+    """Check whether an existing symbol row satisfies a lookup key."""
+    ticker, instrument_type, option_type, expiration_date, strike_price = key
+    if symbol.ticker != ticker or symbol.instrument_type != instrument_type:
+        return False
 
     # Add option-specific filters if applicable
     if instrument_type == InstrumentType.OPTION:
-        query = query.filter(
-            Symbol.option_type == option_type
-        )
+        if symbol.option_type != option_type:
+            return False
 
         # Only filter on date and strike if they're provided
-        if expiration_date:
-            query = query.filter(Symbol.expiration_date == expiration_date)
-
-        if strike_price:
-            query = query.filter(Symbol.strike_price == strike_price)
-
-    symbol = query.first()
-
-    if not symbol:
-        # Create new symbol
-        symbol = Symbol(
-            ticker=ticker,
-            instrument_type=instrument_type,
-            option_type=option_type,
-            expiration_date=expiration_date,
-            strike_price=strike_price
-        )
-        db.add(symbol)
-        db.flush()  # Generate ID without committing
+        if expiration_date and symbol.expiration_date != expiration_date:
+            return False
+
+        if strike_price and symbol.strike_price != strike_price:
+            return False
+
+    return True
+
+
+def _symbol_bucket(ticker: str, instrument_type: InstrumentType, option_type) -> tuple:
+    """Group symbols by the attributes every match must share exactly.
+
+    Only options are told apart by option type; expiry and strike are optional
+    filters applied within a bucket by _symbol_matches.
+    """
+    return ticker, instrument_type, option_type if instrument_type == InstrumentType.OPTION else None
+
+
+def get_or_create_symbol(db: Session, ticker: str, instrument_type: InstrumentType, 
+                       option_type=None, expiration_date=None, 
+                       strike_price=None) -> Symbol:
+    """Find or create a symbol record."""
+    key = _normalize_symbol_key(ticker, instrument_type, option_type, expiration_date, strike_price)
 
-    return symbol
+    # A single upsert covers both lookup and creation without a select-then-insert race
+    symbol_id = resolve_symbols(db, [key])[key]
+    return db.get(Symbol, symbol_id)
 
 
-def save_transactions(transactions: List[Dict[str, Any]]) -> bool:
-    """Save validated transactions to the database."""
-    db = SessionLocal()
+def resolve_symbols(db: Session, keys: Iterable[SymbolKey]) -> Dict[SymbolKey, uuid.UUID]:
+    """Resolve many symbol keys to ids with one SELECT and at most one INSERT.
+
+    Keys must come from _normalize_symbol_key. Existing symbols match on ticker,
+    instrument type and option type, and on expiry and strike when the key has
+    them; missing ones are inserted in bulk.
+    """
+    unique_keys = list(dict.fromkeys(keys))
+    if not unique_keys:
+        return {}
+
+    # Fetch every candidate symbol for the tickers involved in a single query
+    tickers = {key[0] for key in unique_keys}
+    candidates = db.execute(
+        select(Symbol.id, Symbol.ticker, Symbol.instrument_type, Symbol.option_type,
+               Symbol.expiration_date, Symbol.strike_price)
+        .where(Symbol.ticker.in_(tickers))
+    ).all()
+
+    # Options with an expiry and strike can only match a symbol with exactly their details;
+    # other keys are checked against the bucket of symbols they could match
+    exact = {}
+    buckets = {}
+    for row in candidates:
+        exact[row.ticker, row.instrument_type, row.option_type, row.expiration_date, row.strike_price] = row
+        buckets.setdefault(_symbol_bucket(row.ticker, row.instrument_type, row.option_type), []).append(row)
+
+    resolved = {}
+    missing = []
+    for key in unique_keys:
+        ticker, instrument_type, option_type, expiration_date, strike_price = key
+        if instrument_type == InstrumentType.OPTION and expiration_date and strike_price:
+            match = exact.get(key)
+        else:
+            bucket = buckets.get(_symbol_bucket(ticker, instrument_type, option_type), ())
+            match = next((row for row in bucket if _symbol_matches(key, row)), None)
+        if match is not None:
+            resolved[key] = match.id
+        else:
+            missing.append(key)
+
+    if missing:
+        # Insert all missing symbols at once; on a concurrent insert of the same
+        # symbol, the no-op update still returns the existing row's id
+        stmt = pg_insert(Symbol).values([
+            {
+                'id': uuid.uuid4(),
+                'ticker': ticker,
+                'instrument_type': instrument_type,
+                'option_type': option_type,
+                'expiration_date': expiration_date,
+                'strike_price': strike_price,
+            }
+            for ticker, instrument_type, option_type, expiration_date, strike_price in missing
+        ])
+        stmt = stmt.on_conflict_do_update(
+            constraint='uix_symbol_details',
+            set_={'ticker': stmt.excluded.ticker}
+        ).returning(Symbol.id, Symbol.ticker, Symbol.instrument_type, Symbol.option_type,
+                    Symbol.expiration_date, Symbol.strike_price)
+        # Each returned row carries exactly the details of the key it was inserted for
+        inserted = {
+            (row.ticker, row.instrument_type, row.option_type, row.expiration_date, row.strike_price): row.id
+            for row in db.execute(stmt)
+        }
+        for key in missing:
+            symbol_id = inserted.get(key)
+            if symbol_id is None:
+                raise ValueError(f"Symbol was not returned by the upsert: {key}")
+            resolved[key] = symbol_id
+
+    return resolved
+
+
+def _copy_field(value: Any) -> str:
+    """Format a value as a COPY CSV field; only unquoted empty fields are NULL."""
+    if value is None:
+        return ''
+    if isinstance(value, Enum):
+        # SQLAlchemy Enum columns store the member name
+        value = value.name
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_transactions(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """Bulk load transaction rows with COPY on the session's own connection.
+
+    Running on the session's connection keeps the COPY inside the same database
+    transaction as any symbols flushed earlier in the import.
+    """
+    today = date.today()
+    buf = io.StringIO()
+    for row in rows:
+        values = dict(row, id=uuid.uuid4(), created_at=today, updated_at=today)
+        buf.write(','.join(_copy_field(values[col]) for col in COPY_COLUMNS))
+        buf.write('\n')
+    buf.seek(0)
+
+    cursor = db.connection().connection.cursor()
     try:
-        for transaction in transactions:
-            # Skip transactions with errors
-            if transaction.get('errors'):
+        cursor.copy_expert(
+            f"COPY transactions ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT CSV)",
+            buf
+        )
+    finally:
+        cursor.close()
+
+
+def _save_batch(db: Session, transactions: List[Dict[str, Any]], accounts: Dict[str, Account]) -> None:
+    """Insert one batch of transactions, caching accounts across batches."""
+    # Skip transactions with errors
+    valid = [transaction for transaction in transactions if not transaction.get('errors')]
+
+    # Fetch the accounts this batch references that earlier batches haven't, in one query
+    new_names = {transaction['account_name'] for transaction in valid} - accounts.keys()
+    accounts.update(get_accounts_by_name(db, new_names))
+
+    pending = []
+    for transaction in valid:
+        # Resolve account_id from account_name
+        account = accounts.get(transaction['account_name'])
+        if not account:
+            raise ValueError(f"Account not found: {transaction['account_name']}")
+
+        # Work out which symbol this transaction needs, if any
+        symbol_key = None
+        if transaction.get('symbol'):
+            # Determine instrument type
+            instrument_type = transaction.get('instrument_type', InstrumentType.STOCK)
+
+            # Set to OPTION if option details are present, regardless of what was specified;
+            # the CSV importer flags this, other callers are checked field by field
+            is_option = transaction.get('_is_option')
+            if is_option is None:
+                is_option = bool(transaction.get('option_type') or transaction.get('expiration_date')
+                                 or transaction.get('strike_price'))
+            if is_option:
+                instrument_type = InstrumentType.OPTION
+
+            try:
+                symbol_key = _normalize_symbol_key(
+                    transaction['symbol'],
+                    instrument_type,
+                    # Add option details if present
+                    option_type=transaction.get('option_type'),
+                    expiration_date=transaction.get('expiration_date'),
+                    strike_price=transaction.get('strike_price')
+                )
+            except ValueError as e:
+                # If symbol creation fails, log the error and skip this transaction
+                logger.error(f"Error creating symbol: {str(e)}")
                 continue
 
-            # Resolve account_id from account_name
-            account = get_account_by_name(db, transaction['account_name'])
-            if not account:
-                raise ValueError(f"Account not found: {transaction['account_name']}")
-
-            # Resolve or create symbol if applicable
-            symbol_id = None
-            if transaction.get('symbol'):
-                # Determine instrument type
-                instrument_type = transaction.get('instrument_type', InstrumentType.STOCK)
-
-                # Set to OPTION if option details are present, regardless of what was specified
-                if transaction.get('option_type') or transaction.get('expiration_date') or transaction.get('strike_price'):
-                    instrument_type = InstrumentType.OPTION
-
-                try:
-                    symbol = get_or_create_symbol(
-                        db,
-                        transaction['symbol'],
-                        instrument_type,
-                        # Add option details if present
-                        option_type=transaction.get('option_type'),
-                        expiration_date=transaction.get('expiration_date'),
-                        strike_price=transaction.get('strike_price')
-                    )
-                    symbol_id = symbol.id
-                except ValueError as e:
-                    # If symbol creation fails, log the error and skip this transaction
-                    logger.error(f"Error creating symbol: {str(e)}")
-                    continue
-
-            # Create transaction record
-            db_transaction = Transaction(
-                account_id=account.id,
-                symbol_id=symbol_id,
-                transaction_type=transaction['transaction_type'],
-                transaction_date=transaction['transaction_date'],
-                quantity=transaction.get('quantity'),
-                price=transaction.get('price'),
-                amount=transaction['amount'],
-                fees=transaction.get('fees') or Decimal('0'),
-                notes=transaction.get('notes')
-            )
+        pending.append((transaction, account, symbol_key))
+
+    # Look up or create all needed symbols in one batch
+    symbol_ids = resolve_symbols(db, (key for _, _, key in pending if key is not None))
 
+    rows = []
+    for transaction, account, symbol_key in pending:
+        # Collect the transaction record
+        rows.append({
+            'account_id': account.id,
+            'symbol_id': symbol_ids[symbol_key] if symbol_key is not None else None,
+            'transaction_type': transaction['transaction_type'],
+            'transaction_date': transaction['transaction_date'],
+            'quantity': transaction.get('quantity'),
+            'price': transaction.get('price'),
+            'amount': transaction['amount'],
+            'fees': transaction.get('fees') or _ZERO,
+            'notes': transaction.get('notes'),
             # Handle related transaction for transfers
-            if transaction.get('related_transaction_id'):
-                db_transaction.related_transaction_id = transaction['related_transaction_id']
+            'related_transaction_id': transaction.get('related_transaction_id'),
+        })
+
+    if len(rows) >= COPY_THRESHOLD:
+        _copy_transactions(db, rows)
+    elif rows:
+        # Single executemany INSERT, bypassing per-instance unit-of-work tracking
+        db.execute(insert(Transaction), rows)
 
-            db.add(db_transaction)
+
+def save_transactions(transactions: Iterable[Dict[str, Any]]) -> bool:
+    """Save validated transactions to the database.
+
+    Accepts any iterable, such as iter_transactions_from_csv, and writes it in
+    batches of SAVE_BATCH_SIZE so only one batch is held in memory at a time.
+    Everything is still committed together, so a failed import saves nothing.
+    """
+    db = get_session()
+    try:
+        accounts = {}
+        transactions = iter(transactions)
+        while True:
+            batch = list(islice(transactions, SAVE_BATCH_SIZE))
+            if not batch:
+                break
+            _save_batch(db, batch, accounts)
 
         # Commit all transactions in a single transaction
         db.commit()
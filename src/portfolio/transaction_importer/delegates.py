@@ -30,7 +30,8 @@ class DateDelegate(QStyledItemDelegate):
         if value is None or value == '':
             return ''
         if isinstance(value, date):
-            return value.strftime('%Y-%m-%d')
+            # Plain integer formatting avoids strftime's format-code dispatch on every paint
+            return f"{value.year:04d}-{value.month:02d}-{value.day:02d}"
         return str(value)
 
 
@@ -39,6 +40,10 @@ class ComboBoxDelegate(QStyledItemDelegate):
     def __init__(self, options, parent=None):
         super().__init__(parent)
         self.options = options
+        # Position of each option, keeping the first of any duplicates like list.index
+        self._option_index = {}
+        for i, option in enumerate(options):
+            self._option_index.setdefault(option, i)
 
     def createEditor(self, parent, option, index):
         editor = QComboBox(parent)
@@ -47,11 +52,8 @@ class ComboBoxDelegate(QStyledItemDelegate):
 
     def setEditorData(self, editor, index):
         value = index.model().data(index, Qt.EditRole)
-        try:
-            idx = self.options.index(value) if value else 0
-            editor.setCurrentIndex(idx)
-        except ValueError:
-            editor.setCurrentIndex(0)
+        # Unknown or empty values select the first option
+        editor.setCurrentIndex(self._option_index.get(value, 0) if value else 0)
 
     def setModelData(self, editor, model, index):
         value = editor.currentText()
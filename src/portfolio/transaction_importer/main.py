@@ -1,9 +1,19 @@
+import logging
 import sys
-from PySide6.QtWidgets import QApplication
-from portfolio.transaction_importer.review_window import TransactionReviewWindow
 
 
 def main():
+    # Logging is set up here rather than on import of the importer modules
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Fail fast if the database is unreachable, before paying for Qt start-up
+    from portfolio.database import check_connection
+    check_connection()
+
+    # Import Qt and the review window lazily so importing this module stays cheap
+    from PySide6.QtWidgets import QApplication
+    from portfolio.transaction_importer.review_window import TransactionReviewWindow
+
     app = QApplication(sys.argv)
     window = TransactionReviewWindow()
     window.show()
@@ -1,21 +1,98 @@
+import logging
 import sys
-from PySide6.QtWidgets import (QApplication, QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
-                              QTableWidgetItem, QPushButton, QComboBox, QLabel, QLineEdit,
-                              QHeaderView, QMessageBox)
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import (QAbstractItemView, QApplication, QDialog, QVBoxLayout, QHBoxLayout,
+                              QTableView, QPushButton, QComboBox, QLabel, QLineEdit, QHeaderView,
+                              QMessageBox)
+from PySide6.QtCore import QAbstractTableModel, QSignalBlocker, Qt, QTimer
 
 from portfolio.models import TransactionType
-from portfolio.transaction_importer.utils import transaction_type_mapper
+from portfolio.transaction_importer.delegates import ComboBoxDelegate
+from portfolio.transaction_importer.utils import get_transaction_type_mapper
+
+
+# Delay before edits are written to the mappings file
+SAVE_DELAY_MS = 250
+
+
+class _MappingsModel(QAbstractTableModel):
+    """Model over one broker's action text to transaction type mappings.
+
+    Reads and edits the broker's mapping dict in place; combo box editors are
+    only created by the delegate while a type is being edited.
+    """
+    HEADERS = ("Action Text", "Transaction Type")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._mappings = {}
+        self._actions = []
+
+    def set_mappings(self, mappings):
+        """Show the given mapping dict, or nothing if it is None."""
+        self.beginResetModel()
+        self._mappings = mappings if mappings is not None else {}
+        self._actions = list(self._mappings)
+        self.endResetModel()
+
+    def action_at(self, row):
+        """Return the action text shown in a row."""
+        return self._actions[row]
+
+    def rowCount(self, parent=None):
+        return len(self._actions)
+
+    def columnCount(self, parent=None):
+        return len(self.HEADERS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+        action_text = self._actions[index.row()]
+        if index.column() == 0:
+            return action_text
+        return self._mappings[action_text]
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or index.column() != 1 or role != Qt.ItemDataRole.EditRole:
+            return False
+        action_text = self._actions[index.row()]
+        if self._mappings[action_text] == value:
+            # Closing the editor without picking a new type isn't a change
+            return False
+        self._mappings[action_text] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == 1:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
 
 
 class ManageMappingsDialog(QDialog):
     """Dialog for managing transaction type mappings."""
     def __init__(self, parent=None):
         super().__init__(parent)
+        self._mapper = get_transaction_type_mapper()
         self.setWindowTitle("Manage Transaction Type Mappings")
         self.resize(800, 600)
         self._setup_ui()
-        self._load_mappings()
+        # Brokers and mappings are filled in on first show
+        self._mappings_loaded = False
+
+        # Coalesce bursts of edits into a single write of the mappings file
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._mapper._save_mappings)
 
     def _setup_ui(self):
         """Set up the UI components."""
@@ -38,9 +115,14 @@ class ManageMappingsDialog(QDialog):
         broker_layout.addWidget(self.broker_combo)
         layout.addLayout(broker_layout)
 
-        # Table for mappings
-        self.table = QTableWidget(0, 2)
-        self.table.setHorizontalHeaderLabels(["Action Text", "Transaction Type"])
+        # Table for mappings; the type column is edited through a dropdown
+        self.model = _MappingsModel(self)
+        self.model.dataChanged.connect(self._on_type_changed)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setItemDelegateForColumn(
+            1, ComboBoxDelegate([tt.value for tt in TransactionType], self))
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         layout.addWidget(self.table)
@@ -82,12 +164,37 @@ class ManageMappingsDialog(QDialog):
 
         layout.addLayout(button_layout)
 
+    def _ensure_mappings_loaded(self):
+        """Populate brokers and mappings if that hasn't happened yet."""
+        if not self._mappings_loaded:
+            self._mappings_loaded = True
+            self._load_mappings()
+
+    def showEvent(self, event):
+        self._ensure_mappings_loaded()
+        super().showEvent(event)
+
+    def done(self, result):
+        # Accepting, rejecting and closing all end here; write any pending edits first
+        self._flush_pending_save()
+        super().done(result)
+
+    def _schedule_save(self):
+        """Save the mappings shortly, restarting the delay on each new edit."""
+        self._save_timer.start()
+
+    def _flush_pending_save(self):
+        """Save right away if a delayed save is pending."""
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self._mapper._save_mappings()
+
     def _load_mappings(self):
         """Load all broker mappings and populate the UI."""
-        # Clear and refill broker combo
-        self.broker_combo.clear()
-        for broker in sorted(transaction_type_mapper.mappings.keys()):
-            self.broker_combo.addItem(broker)
+        # Clear and refill broker combo without reloading the table for each change
+        with QSignalBlocker(self.broker_combo):
+            self.broker_combo.clear()
+            self.broker_combo.addItems(sorted(self._mapper.mappings.keys()))
 
         # Select first broker if available
         if self.broker_combo.count() > 0:
@@ -104,48 +211,12 @@ class ManageMappingsDialog(QDialog):
 
     def _load_broker_mappings(self, broker):
         """Load mappings for a specific broker into the table."""
-        self.table.setRowCount(0)  # Clear table
-
-        if broker not in transaction_type_mapper.mappings:
-            return
-
-        mappings = transaction_type_mapper.mappings[broker]
-        self.table.setRowCount(len(mappings))
-
-        for i, (action_text, ttype) in enumerate(mappings.items()):
-            # Action text
-            action_item = QTableWidgetItem(action_text)
-            self.table.setItem(i, 0, action_item)
-
-            # Transaction type dropdown
-            type_combo = QComboBox()
-            for tt in TransactionType:
-                type_combo.addItem(tt.value)
-
-            # Set current transaction type
-            try:
-                index = type_combo.findText(ttype)
-                if index >= 0:
-                    type_combo.setCurrentIndex(index)
-            except:
-                pass
-
-            # Connect change signal
-            type_combo.currentIndexChanged.connect(
-                lambda idx, row=i, combo=type_combo: self._on_type_changed(row, combo)
-            )
-            self.table.setCellWidget(i, 1, type_combo)
-
-    def _on_type_changed(self, row, combo):
-        """Handle transaction type changes in the table."""
-        broker = self.broker_combo.currentText()
-        action_text = self.table.item(row, 0).text()
-        new_type = combo.currentText()
+        self.model.set_mappings(self._mapper.mappings.get(broker))
 
-        # Update the mapping
-        if broker in transaction_type_mapper.mappings:
-            transaction_type_mapper.mappings[broker][action_text] = new_type
-            transaction_type_mapper._save_mappings()
+    def _on_type_changed(self):
+        """Persist transaction type changes made in the table."""
+        # The model edits the broker's mapping dict in place
+        self._schedule_save()
 
     def _add_mapping(self):
         """Add a new mapping for the current broker."""
@@ -157,8 +228,9 @@ class ManageMappingsDialog(QDialog):
             QMessageBox.warning(self, "Warning", "Please enter action text")
             return
 
-        # Add the mapping
-        transaction_type_mapper.add_mapping(broker, action_text, ttype)
+        # Add the mapping; this saves every mapping, including any pending edits
+        self._save_timer.stop()
+        self._mapper.add_mapping(broker, action_text, ttype)
 
         # Reload the table
         self._load_broker_mappings(broker)
@@ -168,21 +240,21 @@ class ManageMappingsDialog(QDialog):
 
     def _delete_selected(self):
         """Delete the selected mapping."""
-        selected_rows = set()
-        for item in self.table.selectedItems():
-            selected_rows.add(item.row())
+        # Whole rows are selected, so each selected mapping appears once
+        selected_rows = sorted((index.row() for index in self.table.selectionModel().selectedRows()),
+                               reverse=True)
 
         if not selected_rows:
             return
 
         broker = self.broker_combo.currentText()
-        for row in sorted(selected_rows, reverse=True):
-            action_text = self.table.item(row, 0).text()
-            if broker in transaction_type_mapper.mappings and action_text in transaction_type_mapper.mappings[broker]:
-                del transaction_type_mapper.mappings[broker][action_text]
+        for row in selected_rows:
+            action_text = self.model.action_at(row)
+            if broker in self._mapper.mappings and action_text in self._mapper.mappings[broker]:
+                del self._mapper.mappings[broker][action_text]
 
         # Save changes and reload
-        transaction_type_mapper._save_mappings()
+        self._schedule_save()
         self._load_broker_mappings(broker)
 
     def _add_new_broker(self):
@@ -193,9 +265,9 @@ class ManageMappingsDialog(QDialog):
 
         if ok and broker.strip():
             broker = broker.strip().lower()
-            if broker not in transaction_type_mapper.mappings:
-                transaction_type_mapper.mappings[broker] = {}
-                transaction_type_mapper._save_mappings()
+            if broker not in self._mapper.mappings:
+                self._mapper.mappings[broker] = {}
+                self._schedule_save()
                 self._load_mappings()
                 # Select the new broker
                 index = self.broker_combo.findText(broker)
@@ -207,6 +279,7 @@ class ManageMappingsDialog(QDialog):
 
 def main():
     """Run the mapping manager as a standalone application."""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     app = QApplication(sys.argv)
     dialog = ManageMappingsDialog()
     dialog.exec()
@@ -2,48 +2,168 @@ import json
 import re
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
+from functools import lru_cache
 from typing import Any, Dict, Optional, List
 
 from portfolio.models import OptionType, TransactionType
+from portfolio.transaction_importer.utils import get_transaction_type_mapper
+
+
+# Patterns used by parse_date: an 'as of' date, and any date-like substring
+_AS_OF_RE = re.compile(r'as of ([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}|[0-9]{4}-[0-9]{1,2}-[0-9]{1,2})', re.IGNORECASE)
+_DATE_ANY_RE = re.compile(r'([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}|[0-9]{4}-[0-9]{1,2}-[0-9]{1,2})')
+
+# Patterns used by parse_option_details
+_OCC_RE = re.compile(r'^([A-Z]+)([0-9]{6})([CP])([0-9]{8})$')
+_OPTION_INDICATORS = ('call', 'put', 'exp', '$', 'strike')
+_DESC_TICKER_RE = re.compile(r'^(?:CALL|PUT)\s+([A-Z\s]+)\s')
+_PRICE_RES = (
+    re.compile(r'\$([0-9]+(?:\.[0-9]+)?)'),  # $400 or $400.50
+    re.compile(r'([0-9]+(?:\.[0-9]+)?)\s*(?:strike|put|call)'),  # 400 strike or 400 put
+    re.compile(r'([0-9]+(?:\.[0-9]+)?)'),  # Just a number
+)
+_DATE_RES = (
+    re.compile(r'exp\s+([0-9]{1,2}/[0-9]{1,2}/(?:[0-9]{2}|[0-9]{4}))', re.IGNORECASE),  # exp 12/18/26 or exp 12/18/2026
+    re.compile(r'([0-9]{1,2}/[0-9]{1,2}/(?:[0-9]{2}|[0-9]{4}))', re.IGNORECASE),  # 12/18/26 or 12/18/2026
+)
+
+# Currency symbols and thousands separators removed before parsing decimals,
+# and before parsing strike prices in space-separated option symbols
+_DECIMAL_STRIP = str.maketrans('', '', '$€,')
+_STRIKE_STRIP = str.maketrans('', '', '$,')
+
+# Formats parse_date tries, in order
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y')
+
+# Formats that no earlier entry in DATE_FORMATS can also match, so a value that
+# parses with one of them gets the same result as from parse_date
+_REUSABLE_DATE_FORMATS = frozenset({'%Y-%m-%d', '%m/%d/%Y', '%d-%m-%Y'})
+
+
+def detect_date_format(date_str: str) -> Optional[str]:
+    """Detect the format parse_date would use for a plain date string.
+
+    Returns None if the string needs the 'as of' or cleanup handling, or if its
+    format is only reached after another one that could also match (day-first
+    dates), since such values must keep going through parse_date.
+    """
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+        return fmt if fmt in _REUSABLE_DATE_FORMATS else None
+    return None
 
 
+def _parse_iso_date(date_str: str) -> Optional[date]:
+    """Parse a zero-padded YYYY-MM-DD date with fromisoformat, or return None."""
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-':
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+    return None
+
+
+def parse_date_as(date_str: str, fmt: str) -> Optional[date]:
+    """Parse a date string in one known format, returning None if it doesn't fit.
+
+    Used with a format from detect_date_format; gives the same result as
+    parse_date for any value that fits the format.
+    """
+    if fmt == '%Y-%m-%d':
+        iso_date = _parse_iso_date(date_str)
+        if iso_date is not None:
+            return iso_date
+    try:
+        return datetime.strptime(date_str, fmt).date()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
 def parse_date(date_str: str) -> Optional[date]:
     """Parse date string in various formats.
 
     If date string contains 'as of' (e.g., "07/22/2024 as of 07/19/2024"),
-    use the 'as of' date instead of the main date.
+    use the 'as of' date instead of the main date. Results are cached, since
+    imports repeat the same dates many times.
     """
     # Check for 'as of' pattern
-    as_of_match = re.search(r'as of ([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}|[0-9]{4}-[0-9]{1,2}-[0-9]{1,2})', date_str, re.IGNORECASE)
+    as_of_match = _AS_OF_RE.search(date_str)
     if as_of_match:
         # Use the 'as of' date instead
         date_str = as_of_match.group(1)
 
+    # ISO dates are the most common and fromisoformat is much cheaper than strptime
+    iso_date = _parse_iso_date(date_str)
+    if iso_date is not None:
+        return iso_date
+
     # Try standard formats
-    formats = ['%Y-%m-%d', '%m/%d/%Y', '%d/%m/%Y', '%d-%m-%Y']
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt).date()
         except ValueError:
             continue
 
-    # If nothing worked, try more aggressive cleaning and parsing
-    try:
-        # Remove any text and keep only the first date-like pattern
-        date_pattern = re.search(r'([0-9]{1,2}/[0-9]{1,2}/[0-9]{2,4}|[0-9]{4}-[0-9]{1,2}-[0-9]{1,2})', date_str)
-        if date_pattern:
-            clean_date_str = date_pattern.group(1)
-            for fmt in formats:
-                try:
-                    return datetime.strptime(clean_date_str, fmt).date()
-                except ValueError:
-                    continue
-    except Exception:
-        pass
+    # If nothing worked, try more aggressive cleaning and parsing:
+    # remove any text and keep only the first date-like pattern
+    date_pattern = _DATE_ANY_RE.search(date_str)
+    if date_pattern:
+        clean_date_str = date_pattern.group(1)
+        for fmt in DATE_FORMATS:
+            try:
+                return datetime.strptime(clean_date_str, fmt).date()
+            except ValueError:
+                continue
 
     return None
 
 
+# Standard option transaction formats, checked in order by standardize_option_transaction_type
+_OPTION_ACTION_MAPPING = {
+    # Buy to Open variations
+    'buy to open': TransactionType.BUY_TO_OPEN,
+    'bto': TransactionType.BUY_TO_OPEN,
+    'open buy': TransactionType.BUY_TO_OPEN,
+    'opening purchase': TransactionType.BUY_TO_OPEN,
+
+    # Sell to Open variations
+    'sell to open': TransactionType.SELL_TO_OPEN,
+    'sto': TransactionType.SELL_TO_OPEN,
+    'open sell': TransactionType.SELL_TO_OPEN,
+    'opening sale': TransactionType.SELL_TO_OPEN,
+    'option writing': TransactionType.SELL_TO_OPEN,
+    'write': TransactionType.SELL_TO_OPEN,
+
+    # Buy to Close variations
+    'buy to close': TransactionType.BUY_TO_CLOSE,
+    'btc': TransactionType.BUY_TO_CLOSE,
+    'close buy': TransactionType.BUY_TO_CLOSE,
+    'closing purchase': TransactionType.BUY_TO_CLOSE,
+
+    # Sell to Close variations
+    'sell to close': TransactionType.SELL_TO_CLOSE,
+    'stc': TransactionType.SELL_TO_CLOSE,
+    'close sell': TransactionType.SELL_TO_CLOSE,
+    'closing sale': TransactionType.SELL_TO_CLOSE,
+
+    # Exercise/Assignment
+    'exercise': TransactionType.OPTION_EXERCISE,
+    'exercised': TransactionType.OPTION_EXERCISE,
+    'assignment': TransactionType.OPTION_ASSIGNMENT,
+    'assigned': TransactionType.OPTION_ASSIGNMENT,
+
+    # Expiration
+    'expiration': TransactionType.OPTION_EXPIRATION,
+    'expired': TransactionType.OPTION_EXPIRATION,
+    'worthless': TransactionType.OPTION_EXPIRATION
+}
+_OPTION_ACTION_ITEMS = tuple(_OPTION_ACTION_MAPPING.items())
+
+
 def standardize_option_transaction_type(action_str: str, is_option: bool = False, quantity: Optional[Decimal] = None, broker: Optional[str] = None) -> TransactionType:
     """Standardize option transaction types from various formats.
 
@@ -66,59 +186,36 @@ def standardize_option_transaction_type(action_str: str, is_option: bool = False
         - "Sell to Close" → TransactionType.SELL_TO_CLOSE
         - "Journal Shares" → TransactionType.TRANSFER_IN or TransactionType.TRANSFER_OUT (based on quantity)
     """
-    # First try to use the transaction type mapper if available
-    from portfolio.transaction_importer.utils import transaction_type_mapper
+    # Only the sign of the quantity matters, which keeps the cache key small; the
+    # mapper revision makes edited mappings take effect immediately. A NaN quantity
+    # can't be compared, so it gives no direction, like a missing one
+    if quantity is None or quantity.is_nan():
+        quantity_sign = None
+    else:
+        quantity_sign = -1 if quantity < 0 else 1
+    return _standardize_transaction_type(
+        action_str.lower().strip(), is_option, quantity_sign, broker, get_transaction_type_mapper().revision
+    )
+
 
-    action = action_str.lower().strip()
-    mapped_type = transaction_type_mapper.get_transaction_type(action, broker, quantity)
+@lru_cache(maxsize=8192)
+def _standardize_transaction_type(action: str, is_option: bool, quantity_sign: Optional[int],
+                                  broker: Optional[str], mapper_revision: int) -> TransactionType:
+    """Cached core of standardize_option_transaction_type for a normalized action."""
+    # First try to use the transaction type mapper if available
+    mapped_type = get_transaction_type_mapper().get_transaction_type(action, broker, quantity_sign)
     if mapped_type:
         return mapped_type
 
     # Fallback to hardcoded mappings if no match found in the mapper
     # or if the mapper isn't available
 
-    # Check for standard option transaction formats
-    option_action_mapping = {
-        # Buy to Open variations
-        'buy to open': TransactionType.BUY_TO_OPEN,
-        'bto': TransactionType.BUY_TO_OPEN,
-        'open buy': TransactionType.BUY_TO_OPEN,
-        'opening purchase': TransactionType.BUY_TO_OPEN,
-
-        # Sell to Open variations
-        'sell to open': TransactionType.SELL_TO_OPEN,
-        'sto': TransactionType.SELL_TO_OPEN,
-        'open sell': TransactionType.SELL_TO_OPEN,
-        'opening sale': TransactionType.SELL_TO_OPEN,
-        'option writing': TransactionType.SELL_TO_OPEN,
-        'write': TransactionType.SELL_TO_OPEN,
-
-        # Buy to Close variations
-        'buy to close': TransactionType.BUY_TO_CLOSE,
-        'btc': TransactionType.BUY_TO_CLOSE,
-        'close buy': TransactionType.BUY_TO_CLOSE,
-        'closing purchase': TransactionType.BUY_TO_CLOSE,
-
-        # Sell to Close variations
-        'sell to close': TransactionType.SELL_TO_CLOSE,
-        'stc': TransactionType.SELL_TO_CLOSE,
-        'close sell': TransactionType.SELL_TO_CLOSE,
-        'closing sale': TransactionType.SELL_TO_CLOSE,
-
-        # Exercise/Assignment
-        'exercise': TransactionType.OPTION_EXERCISE,
-        'exercised': TransactionType.OPTION_EXERCISE,
-        'assignment': TransactionType.OPTION_ASSIGNMENT,
-        'assigned': TransactionType.OPTION_ASSIGNMENT,
-
-        # Expiration
-        'expiration': TransactionType.OPTION_EXPIRATION,
-        'expired': TransactionType.OPTION_EXPIRATION,
-        'worthless': TransactionType.OPTION_EXPIRATION
-    }
-
-    # Direct mapping if action is in our dictionary
-    for key, value in option_action_mapping.items():
+    # Direct mapping if action is in our dictionary; an exact match gives the
+    # same result as the scan below, which returns the first key found in the action
+    transaction_type = _OPTION_ACTION_MAPPING.get(action)
+    if transaction_type is not None:
+        return transaction_type
+    for key, value in _OPTION_ACTION_ITEMS:
         if key in action:
             return value
 
@@ -146,8 +243,8 @@ def standardize_option_transaction_type(action_str: str, is_option: bool = False
         return TransactionType.WITHDRAWAL
     elif 'transfer' in action or 'journal' in action:
         # Determine direction based on quantity if available
-        if quantity is not None:
-            return TransactionType.TRANSFER_OUT if quantity < 0 else TransactionType.TRANSFER_IN
+        if quantity_sign is not None:
+            return TransactionType.TRANSFER_OUT if quantity_sign < 0 else TransactionType.TRANSFER_IN
         return TransactionType.TRANSFER_IN  # Default to transfer in if no quantity info
     elif 'fee' in action:
         return TransactionType.FEE
@@ -162,8 +259,14 @@ def parse_decimal(value_str: str) -> Optional[Decimal]:
     if not value_str or value_str.strip() == '':
         return None
 
+    # Most values are plain numbers; Decimal already ignores surrounding whitespace
+    try:
+        return Decimal(value_str)
+    except InvalidOperation:
+        pass
+
     # Remove common currency symbols and commas
-    cleaned = value_str.replace('$', '').replace('€', '').replace(',', '').strip()
+    cleaned = value_str.translate(_DECIMAL_STRIP).strip()
 
     try:
         return Decimal(cleaned)
@@ -181,6 +284,12 @@ def parse_json(json_str: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _looks_like_occ(symbol: str) -> bool:
+    """Cheaply rule out symbols that can't match the OCC pattern."""
+    # Shortest OCC symbol: one-letter root, six date digits, C or P, eight strike digits
+    return len(symbol) >= 16 and symbol[-9] in 'CP' and ' ' not in symbol
+
+
 def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]:
     """Parse option details from symbol and description.
 
@@ -205,8 +314,7 @@ def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]
         return result
 
     # Try to parse OCC standard format (e.g., MSFT211217C00340000)
-    occ_pattern = r'^([A-Z]+)([0-9]{6})([CP])([0-9]{8})$'
-    occ_match = re.match(occ_pattern, symbol)
+    occ_match = _OCC_RE.match(symbol) if _looks_like_occ(symbol) else None
 
     if occ_match:
         result['is_option'] = True
@@ -230,7 +338,7 @@ def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]
         # Parse strike price (divide by 1000 to get actual price)
         try:
             result['strike_price'] = Decimal(strike_str) / 1000
-        except (ValueError, InvalidOperation):
+        except InvalidOperation:
             pass
 
         result['ticker'] = ticker
@@ -239,53 +347,39 @@ def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]
     # Try to parse from description if available
     if description:
         # Look for option indicators
-        option_indicators = ['call', 'put', 'exp', '$', 'strike']
-        if any(indicator in description.lower() for indicator in option_indicators):
+        description_lower = description.lower()
+        if any(indicator in description_lower for indicator in _OPTION_INDICATORS):
             result['is_option'] = True
 
             # Try to find ticker at the beginning of description
             if not symbol:
-                ticker_match = re.search(r'^(?:CALL|PUT)\s+([A-Z\s]+)\s', description)
+                ticker_match = _DESC_TICKER_RE.search(description)
                 if ticker_match:
                     result['ticker'] = ticker_match.group(1).strip()
 
             # Try to determine option type
-            if 'call' in description.lower():
+            if 'call' in description_lower:
                 result['option_type'] = OptionType.CALL
-            elif 'put' in description.lower():
+            elif 'put' in description_lower:
                 result['option_type'] = OptionType.PUT
 
             # Try to extract strike price
-            price_patterns = [
-                r'\$([0-9]+(?:\.[0-9]+)?)',  # $400 or $400.50
-                r'([0-9]+(?:\.[0-9]+)?)\s*(?:strike|put|call)',  # 400 strike or 400 put
-                r'([0-9]+(?:\.[0-9]+)?)'  # Just a number
-            ]
-
-            for pattern in price_patterns:
-                price_match = re.search(pattern, description)
+            for pattern in _PRICE_RES:
+                price_match = pattern.search(description)
                 if price_match:
                     try:
                         result['strike_price'] = Decimal(price_match.group(1))
                         break
-                    except (ValueError, InvalidOperation):
+                    except InvalidOperation:
                         pass
 
             # Try to extract expiration date
-            date_patterns = [
-                r'exp\s+([0-9]{1,2}/[0-9]{1,2}/(?:[0-9]{2}|[0-9]{4}))',  # exp 12/18/26 or exp 12/18/2026
-                r'([0-9]{1,2}/[0-9]{1,2}/(?:[0-9]{2}|[0-9]{4}))' # 12/18/26 or 12/18/2026
-            ]
-
-            for pattern in date_patterns:
-                date_match = re.search(pattern, description, re.IGNORECASE)
+            for pattern in _DATE_RES:
+                date_match = pattern.search(description)
                 if date_match:
-                    date_str = date_match.group(1)
-                    try:
-                        result['expiration_date'] = parse_date(date_str)
-                        break
-                    except ValueError:
-                        pass
+                    # parse_date returns None rather than raising for unparseable dates
+                    result['expiration_date'] = parse_date(date_match.group(1))
+                    break
 
     # If symbol has a space and potentially contains option information
     # Example: "MSFT 12/18/2026 400.00 C"
@@ -296,30 +390,32 @@ def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]
             result['ticker'] = parts[0]
             result['is_option'] = True
 
-            # Look for date, strike price, and option type
+            # Look for date, strike price, and option type; fields that are
+            # already known aren't probed for again
             for part in parts[1:]:
-                # Check if part is a date
-                date_val = parse_date(part)
-                if date_val and not result['expiration_date']:
-                    result['expiration_date'] = date_val
-                    continue
+                # Check if part is a date; every date form parse_date knows has a '/' or '-'
+                if not result['expiration_date'] and ('/' in part or '-' in part):
+                    date_val = parse_date(part)
+                    if date_val:
+                        result['expiration_date'] = date_val
+                        continue
 
                 # Check if part is a strike price
-                try:
-                    # Strip currency symbol if present
-                    price_str = part.replace('$', '').replace(',', '')
-                    price_val = Decimal(price_str)
-                    if not result['strike_price']:
-                        result['strike_price'] = price_val
+                if not result['strike_price']:
+                    try:
+                        # Strip currency symbol if present
+                        price_str = part.translate(_STRIKE_STRIP)
+                        result['strike_price'] = Decimal(price_str)
                         continue
-                except (ValueError, InvalidOperation):
-                    pass
+                    except InvalidOperation:
+                        pass
 
                 # Check if part indicates option type
-                if part.upper() in ['C', 'CALL'] and not result['option_type']:
-                    result['option_type'] = OptionType.CALL
-                elif part.upper() in ['P', 'PUT'] and not result['option_type']:
-                    result['option_type'] = OptionType.PUT
+                if not result['option_type']:
+                    if part.upper() in ['C', 'CALL']:
+                        result['option_type'] = OptionType.CALL
+                    elif part.upper() in ['P', 'PUT']:
+                        result['option_type'] = OptionType.PUT
 
     # If we've determined this is an option but don't have an option type,
     # default to CALL (most common)
@@ -329,19 +425,30 @@ def parse_option_details(symbol: str, description: str = None) -> Dict[str, Any]
     return result
 
 
+# Sign fees take in a trade's amount: buys pay them on top, sells have them deducted
+TRADE_FEE_SIGNS = {TransactionType.BUY: 1, TransactionType.SELL: -1}
+_FEE_SIGNS_BY_ACTION = {ttype.value: sign for ttype, sign in TRADE_FEE_SIGNS.items()}
+
+
 def calculate_amount(quantity: Optional[Decimal], price: Optional[Decimal], 
                     fees: Optional[Decimal], action: str) -> Optional[Decimal]:
     """Calculate transaction amount based on quantity, price, and fees."""
-    if action in ['buy', 'sell'] and quantity is not None and price is not None:
-        amount = quantity * price
-        if fees is not None:
-            # For buys, fees increase the total amount paid
-            # For sells, fees decrease the total amount received
-            if action == 'buy':
-                amount += fees
-            else:  # sell
-                amount -= fees
-        return amount
-
-    # For non-trade transactions, amount needs to be provided explicitly
-    return None
+    return calculate_trade_amount(quantity, price, fees, _FEE_SIGNS_BY_ACTION.get(action, 0))
+
+
+def calculate_trade_amount(quantity: Optional[Decimal], price: Optional[Decimal],
+                           fees: Optional[Decimal], fee_sign: int) -> Optional[Decimal]:
+    """Calculate a trade's amount from quantity, price, and fees.
+
+    fee_sign comes from TRADE_FEE_SIGNS: 1 for buys, -1 for sells, and 0 for
+    anything else, whose amount needs to be provided explicitly.
+    """
+    if not fee_sign or quantity is None or price is None:
+        return None
+
+    amount = quantity * price
+    if fees is not None:
+        # For buys, fees increase the total amount paid
+        # For sells, fees decrease the total amount received
+        amount = amount + fees if fee_sign > 0 else amount - fees
+    return amount
@@ -1,7 +1,7 @@
 from decimal import Decimal
 from pathlib import Path
 
-from PySide6.QtCore import Slot, QRegularExpression
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot, QRegularExpression
 from PySide6.QtGui import QRegularExpressionValidator
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QLabel, QPushButton, QTableView, QHeaderView,
@@ -12,10 +12,70 @@ from portfolio.transaction_importer.column_mapper import ColumnMapperDialog
 from portfolio.transaction_importer.account_selection import AccountSelectionDialog
 from portfolio.transaction_importer.table_model import TransactionTableModel
 from portfolio.transaction_importer.delegates import DateDelegate, ComboBoxDelegate, DecimalDelegate, JSONDelegate
-from portfolio.transaction_importer.csv_import import import_transactions_from_csv
+from portfolio.transaction_importer.csv_import import import_transactions_from_csv, iter_transactions_from_csv
 from portfolio.transaction_importer.db import save_transactions
 
 
+# Columns shown in the review table
+COLUMNS = (
+    'transaction_date', 'symbol', 'transaction_type', 'instrument_type',
+    'quantity', 'price', 'amount', 'fees', 'account_name', 
+    'journal_details', 'notes', 'errors'
+)
+
+# Parsed transactions are handed to the table this many at a time while a file loads
+LOAD_BATCH_SIZE = 1000
+
+
+class CsvLoadSignals(QObject):
+    """Signals for reporting the progress and outcome of a CsvLoadWorker."""
+    batch = Signal(list)
+    finished = Signal()
+    error = Signal(str)
+
+
+class CsvLoadWorker(QRunnable):
+    """Parse a CSV file with column mappings on a thread pool thread.
+
+    Parsed transactions are delivered in batches of LOAD_BATCH_SIZE through
+    the batch signal, which is received on the GUI thread, so the table can
+    show early rows while the rest of the file is parsed.
+    """
+    def __init__(self, filepath, column_mappings, account_name_override=None):
+        super().__init__()
+        self.filepath = filepath
+        self.column_mappings = column_mappings
+        self.account_name_override = account_name_override
+        self.signals = CsvLoadSignals()
+
+    def run(self):
+        account_name = self.account_name_override
+        batch = []
+        try:
+            for transaction in iter_transactions_from_csv(self.filepath, self.column_mappings):
+                # Apply account override if needed
+                if account_name:
+                    transaction['account_name'] = account_name
+
+                    # Remove any account-related errors since we just set the account;
+                    # most rows have none, so their empty list is left as is
+                    errors = transaction.get('errors')
+                    if errors:
+                        transaction['errors'] = [err for err in errors if 'account' not in err.lower()]
+
+                batch.append(transaction)
+                if len(batch) >= LOAD_BATCH_SIZE:
+                    self.signals.batch.emit(batch)
+                    batch = []
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+
+        if batch:
+            self.signals.batch.emit(batch)
+        self.signals.finished.emit()
+
+
 class TransactionReviewWindow(QMainWindow):
     """Main window for reviewing and editing imported transactions."""
     def __init__(self, parent=None):
@@ -37,6 +97,11 @@ class TransactionReviewWindow(QMainWindow):
         self.column_mappings = None
         self.account_name_override = None
         self.decimal_validator = self._create_decimal_validator()
+        # Worker of the CSV load in progress, if any
+        self._load_worker = None
+
+        # One model and set of delegates serve every file loaded
+        self._setup_table_model()
 
     def _setup_ui(self):
         """Set up the UI components."""
@@ -53,7 +118,15 @@ class TransactionReviewWindow(QMainWindow):
         self.table_view = QTableView()
         self.table_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table_view.setAlternatingRowColors(True)
-        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Columns are sized to their contents once per load rather than re-laid out on every resize
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.table_view.horizontalHeader().setStretchLastSection(True)
+        # Measure only the visible rows, not the first thousand, when sizing columns
+        self.table_view.horizontalHeader().setResizeContentsPrecision(0)
+        # Uniform row heights spare the view from measuring rows while scrolling
+        vertical_header = self.table_view.verticalHeader()
+        vertical_header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        vertical_header.setDefaultSectionSize(self.table_view.fontMetrics().height() + 6)
         self.main_layout.addWidget(self.table_view)
 
         # Buttons layout
@@ -85,51 +158,42 @@ class TransactionReviewWindow(QMainWindow):
         regex = QRegularExpression(r"^-?\d*(\.\d{0,8})?$")
         return QRegularExpressionValidator(regex)
 
-    def _setup_table_model(self, transactions):
+    def _setup_table_model(self):
         """Set up the table model and delegates."""
-        # Define columns to display
-        columns = [
-            'transaction_date', 'symbol', 'transaction_type', 'instrument_type',
-            'quantity', 'price', 'amount', 'fees', 'account_name', 
-            'journal_details', 'notes', 'errors'
-        ]
+        col_idx = {column: i for i, column in enumerate(COLUMNS)}
 
         # Create model
-        self.model = TransactionTableModel(transactions, columns, self)
+        self.model = TransactionTableModel([], COLUMNS, self)
         self.table_view.setModel(self.model)
 
         # Set up delegates for different column types
         date_delegate = DateDelegate(self)
         self.table_view.setItemDelegateForColumn(
-            columns.index('transaction_date'), date_delegate)
+            col_idx['transaction_date'], date_delegate)
 
         # Transaction type delegate
         tx_type_options = [t.value for t in TransactionType]
         tx_type_delegate = ComboBoxDelegate(tx_type_options, self)
         self.table_view.setItemDelegateForColumn(
-            columns.index('transaction_type'), tx_type_delegate)
+            col_idx['transaction_type'], tx_type_delegate)
 
         # Instrument type delegate
         instr_type_options = [t.value for t in InstrumentType]
         instr_type_delegate = ComboBoxDelegate(instr_type_options, self)
         self.table_view.setItemDelegateForColumn(
-            columns.index('instrument_type'), instr_type_delegate)
+            col_idx['instrument_type'], instr_type_delegate)
 
         # Decimal delegates
         decimal_columns = ['quantity', 'price', 'amount', 'fees']
         decimal_delegate = DecimalDelegate(self)
         for col in decimal_columns:
             self.table_view.setItemDelegateForColumn(
-                columns.index(col), decimal_delegate)
+                col_idx[col], decimal_delegate)
 
         # JSON delegate
         json_delegate = JSONDelegate(self)
         self.table_view.setItemDelegateForColumn(
-            columns.index('journal_details'), json_delegate)
-
-        # Update button states
-        self.save_button.setEnabled(not self.model.hasErrors())
-        self.discard_button.setEnabled(True)
+            col_idx['journal_details'], json_delegate)
 
         # Connect to dataChanged signal to update save button state
         self.model.dataChanged.connect(self._on_data_changed)
@@ -177,34 +241,8 @@ class TransactionReviewWindow(QMainWindow):
                 else:
                     self.account_name_override = None
 
-                # Now parse the file with the mappings
-                self.transactions = import_transactions_from_csv(filepath, self.column_mappings)
-
-                # Apply account override if needed
-                if self.account_name_override:
-                    for transaction in self.transactions:
-                        transaction['account_name'] = self.account_name_override
-
-                    # Validate all rows immediately to make sure account name is properly recognized
-                    for i, transaction in enumerate(self.transactions):
-                        if 'errors' in transaction:
-                            # Remove any account-related errors since we just set the account
-                            transaction['errors'] = [err for err in transaction.get('errors', []) 
-                                                      if 'account' not in err.lower()]
-
-                    # Force model to update immediately after setting account override
-                    if hasattr(self, 'model'):
-                        self.model.layoutChanged.emit()
-
-                # Show file info in status label
-                filename = Path(filepath).name
-                self.status_label.setText(
-                    f"Loaded {filename} with {len(self.transactions)} transactions. "
-                    f"Fix any highlighted errors before saving."
-                )
-
-                # Set up table model with the imported data
-                self._setup_table_model(self.transactions)
+                # Now parse the file with the mappings, off the GUI thread
+                self._start_csv_load(filepath)
             else:
                 # User canceled the mapping
                 self.filepath = ""
@@ -212,6 +250,75 @@ class TransactionReviewWindow(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load CSV: {str(e)}")
 
+    def _start_csv_load(self, filepath):
+        """Parse the CSV file in the background, adding rows to the table as they arrive."""
+        worker = CsvLoadWorker(filepath, self.column_mappings, self.account_name_override)
+        worker.signals.batch.connect(self._on_csv_batch)
+        worker.signals.finished.connect(self._on_csv_loaded)
+        worker.signals.error.connect(self._on_csv_load_failed)
+        self._load_worker = worker
+
+        # Start from an empty table; the model appends to this list as batches arrive
+        self.transactions = []
+        self.model.resetData(self.transactions)
+        self.status_label.setText(f"Loading {Path(filepath).name}...")
+
+        # Rows can be reviewed during the load, but not saved or discarded. The
+        # worker reads the shared type mappings, so they can't be edited meanwhile
+        self.load_button.setEnabled(False)
+        self.save_button.setEnabled(False)
+        self.discard_button.setEnabled(False)
+        self.manage_mappings_button.setEnabled(False)
+
+        QThreadPool.globalInstance().start(worker)
+
+    def _finish_csv_load(self):
+        """Re-enable loading and mapping edits once the CSV load worker is done."""
+        self._load_worker = None
+        self.load_button.setEnabled(True)
+        self.manage_mappings_button.setEnabled(True)
+
+    @Slot(list)
+    def _on_csv_batch(self, transactions):
+        """Add a batch of transactions parsed by the CSV load worker."""
+        first_batch = self.model.rowCount() == 0
+        self.model.appendRows(transactions)
+        if first_batch:
+            # Size columns to the first rows shown
+            self.table_view.resizeColumnsToContents()
+
+        self.status_label.setText(
+            f"Loading {Path(self.filepath).name}: {len(self.transactions)} transactions so far..."
+        )
+
+    @Slot()
+    def _on_csv_loaded(self):
+        """Finish a CSV load once the worker has parsed every row."""
+        self._finish_csv_load()
+
+        # Show file info in status label
+        filename = Path(self.filepath).name
+        self.status_label.setText(
+            f"Loaded {filename} with {len(self.transactions)} transactions. "
+            f"Fix any highlighted errors before saving."
+        )
+
+        # Update button states
+        self.save_button.setEnabled(not self.model.hasErrors())
+        self.discard_button.setEnabled(True)
+
+    @Slot(str)
+    def _on_csv_load_failed(self, message):
+        """Report a CSV load worker failure."""
+        self._finish_csv_load()
+
+        # Drop any rows shown before the failure
+        self.transactions = []
+        self.model.resetData(self.transactions)
+        self.status_label.setText("No file loaded")
+
+        QMessageBox.critical(self, "Error", f"Failed to load CSV: {message}")
+
     @Slot()
     def save_to_database(self):
         """Save valid transactions to the database."""
@@ -257,7 +364,7 @@ class TransactionReviewWindow(QMainWindow):
         self.status_label.setText("No file loaded")
 
         # Clear table view
-        self.table_view.setModel(None)
+        self.model.resetData([])
 
         # Update button states
         self.save_button.setEnabled(False)
@@ -266,6 +373,10 @@ class TransactionReviewWindow(QMainWindow):
     @Slot()
     def _on_data_changed(self):
         """Update UI when data in the model changes."""
+        if self._load_worker is not None:
+            # Rows edited during a load are checked once it finishes
+            return
+
         # Enable/disable save button based on validation state
         has_errors = self.model.hasErrors()
         self.save_button.setEnabled(not has_errors)
@@ -280,11 +391,12 @@ class TransactionReviewWindow(QMainWindow):
                 f"Ready to import {len(self.transactions)} transactions."
             )
 
-            # For option expiration, ensure amount is 0
-            for transaction in self.transactions:
-                if transaction.get('transaction_type') == TransactionType.OPTION_EXPIRATION:
-                    transaction['price'] = Decimal('0')
-                    transaction['amount'] = Decimal('0')
+            # For option expiration, ensure amount is 0; the model tracks which rows those are
+            transactions = self.model.getTransactions()
+            for row in self.model.getOptionExpirationRows():
+                transaction = transactions[row]
+                transaction['price'] = Decimal('0')
+                transaction['amount'] = Decimal('0')
 
     @Slot()
     def manage_mappings(self):
@@ -2,11 +2,85 @@ import json
 from datetime import date
 from decimal import Decimal, InvalidOperation
 
-from PySide6.QtCore import QAbstractTableModel, Qt
-from PySide6.QtGui import QColor
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+from PySide6.QtGui import QBrush, QColor
 
-from portfolio.models import TransactionType, InstrumentType
-from portfolio.transaction_importer.parsers import calculate_amount, parse_date
+from portfolio.models import (
+    INSTRUMENT_TYPE_BY_VALUE, TRANSACTION_TYPE_BY_VALUE, TransactionType, InstrumentType
+)
+from portfolio.transaction_importer.parsers import TRADE_FEE_SIGNS, calculate_trade_amount, parse_date
+
+
+# Roles data() answers, bound once since looking up Qt enum members is slow;
+# Qt asks for many more roles on every paint
+_DISPLAY_ROLE = Qt.ItemDataRole.DisplayRole
+_EDIT_ROLE = Qt.ItemDataRole.EditRole
+_BACKGROUND_ROLE = Qt.ItemDataRole.BackgroundRole
+_FOREGROUND_ROLE = Qt.ItemDataRole.ForegroundRole
+_HANDLED_ROLES = frozenset((_DISPLAY_ROLE, _EDIT_ROLE, _BACKGROUND_ROLE, _FOREGROUND_ROLE))
+
+# Roles affected by editing a cell's value
+_EDIT_ROLES = (_DISPLAY_ROLE, _EDIT_ROLE)
+
+# Brushes returned for every painted cell; handing Qt brushes saves converting colors each time.
+# Black text for all cells, so it stays visible against the error background
+_TEXT_BRUSH = QBrush(QColor(Qt.black))
+_ERROR_BRUSH = QBrush(QColor(255, 200, 200))  # Light red for error rows
+
+
+def _format_date(value, role):
+    # Format date for display role, return date object for edit role
+    if role == _DISPLAY_ROLE and isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+
+# Enum values by member, so painting skips the enum's value attribute lookup
+_TRANSACTION_TYPE_VALUES = {ttype: ttype.value for ttype in TransactionType}
+_INSTRUMENT_TYPE_VALUES = {itype: itype.value for itype in InstrumentType}
+
+# Transaction types that need a symbol, and those that also need quantity and price
+_SYMBOL_REQUIRED_TYPES = frozenset((
+    TransactionType.BUY, TransactionType.SELL, TransactionType.DIVIDEND, TransactionType.SPLIT,
+))
+_BUY_SELL_TYPES = frozenset((TransactionType.BUY, TransactionType.SELL))
+
+
+def _format_transaction_type(value, role):
+    return _TRANSACTION_TYPE_VALUES.get(value, value)
+
+
+def _format_instrument_type(value, role):
+    return _INSTRUMENT_TYPE_VALUES.get(value, value)
+
+
+def _format_decimal(value, role):
+    # Ensure string conversion for display
+    if role == _DISPLAY_ROLE and isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _format_errors(value, role):
+    return "\n".join(value) if value else ""
+
+
+def _format_plain(value, role):
+    return value
+
+
+# Display and edit formatting by column; other columns show their value as is.
+# journal_details is formatted by the model, which caches the JSON text
+_COLUMN_FORMATTERS = {
+    'transaction_date': _format_date,
+    'transaction_type': _format_transaction_type,
+    'instrument_type': _format_instrument_type,
+    'quantity': _format_decimal,
+    'price': _format_decimal,
+    'fees': _format_decimal,
+    'amount': _format_decimal,
+    'errors': _format_errors,
+}
 
 
 class TransactionTableModel(QAbstractTableModel):
@@ -15,7 +89,49 @@ class TransactionTableModel(QAbstractTableModel):
         super().__init__(parent)
         self._data = data
         self._headers = headers
-        self.error_color = QColor(255, 200, 200)  # Light red for error rows
+        self._col_names = tuple(headers)
+        # Formatter for each column, looked up by position when painting
+        formatters = dict(_COLUMN_FORMATTERS, journal_details=self._format_journal)
+        self._formatters = tuple(formatters.get(name, _format_plain) for name in headers)
+        # JSON text of journal_details dicts by object id, so painting doesn't re-serialize them
+        self._journal_text = {}
+        self._col_idx = {name: i for i, name in enumerate(headers)}
+        self._rebuild_indexes()
+
+    def resetData(self, data):
+        """Replace all transactions shown by the model."""
+        self.beginResetModel()
+        self._data = data
+        self._rebuild_indexes()
+        self.endResetModel()
+
+    def appendRows(self, rows):
+        """Add transactions to the end of the model."""
+        if not rows:
+            return
+        start = len(self._data)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._data.extend(rows)
+        self._index_rows(start)
+        self.endInsertRows()
+
+    def _rebuild_indexes(self):
+        """Recompute the per-row lookups kept alongside the data."""
+        # Rows that currently have errors, kept in step by the error helpers
+        self._error_rows = set()
+        # Rows of option expirations, kept in step as transaction types are edited
+        self._option_expiration_rows = set()
+        self._journal_text.clear()
+        self._index_rows(0)
+
+    def _index_rows(self, start):
+        """Add the rows from start onwards to the per-row lookups."""
+        for row in range(start, len(self._data)):
+            transaction = self._data[row]
+            if transaction.get('errors'):
+                self._error_rows.add(row)
+            if transaction.get('transaction_type') == TransactionType.OPTION_EXPIRATION:
+                self._option_expiration_rows.add(row)
 
     def rowCount(self, parent=None):
         return len(self._data)
@@ -29,46 +145,29 @@ class TransactionTableModel(QAbstractTableModel):
         return None
 
     def data(self, index, role):
-        if not index.isValid():
+        if role not in _HANDLED_ROLES or not index.isValid():
             return None
 
-        row, col = index.row(), index.column()
-        column_name = self._headers[col]
+        # Display and edit are asked for most often, so they're checked first
+        row = index.row()
+        if role == _DISPLAY_ROLE or role == _EDIT_ROLE:
+            col = index.column()
+            return self._formatters[col](self._data[row].get(self._col_names[col]), role)
 
-        # Set foreground color to ensure text is visible against background
-        if role == Qt.ItemDataRole.ForegroundRole:
-            # Use black text for all cells
-            return Qt.black
-
-        if role == Qt.ItemDataRole.BackgroundRole and self._data[row].get('errors'):
-            return self.error_color
-
-        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
-            # Handle special display formatting
-            value = self._data[row].get(column_name)
-
-            if column_name == 'transaction_date' and isinstance(value, date):
-                # Format date for display role, return date object for edit role
-                if role == Qt.ItemDataRole.DisplayRole:
-                    return value.strftime('%Y-%m-%d')  # Format date as string for display
-                return value
-            elif column_name == 'transaction_type' and isinstance(value, TransactionType):
-                return value.value
-            elif column_name == 'instrument_type' and isinstance(value, InstrumentType):
-                return value.value
-            elif column_name in ('quantity', 'price', 'fees', 'amount') and isinstance(value, Decimal):
-                # Format decimal values for display
-                if role == Qt.ItemDataRole.DisplayRole:
-                    return str(value)  # Ensure string conversion for display
-                return value
-            elif column_name == 'journal_details' and isinstance(value, dict):
-                return value if role == Qt.ItemDataRole.EditRole else json.dumps(value)
-            elif column_name == 'errors':
-                return "\n".join(value) if value else ""
-
-            return value
+        if role == _BACKGROUND_ROLE:
+            return _ERROR_BRUSH if row in self._error_rows else None
 
-        return None
+        # Only the foreground role is left; black text stays visible against the background
+        return _TEXT_BRUSH
+
+    def _format_journal(self, value, role):
+        if role == _DISPLAY_ROLE and isinstance(value, dict):
+            # Entries hold a reference to their dict, so an id can't be reused while cached
+            cached = self._journal_text.get(id(value))
+            if cached is None:
+                cached = self._journal_text[id(value)] = (value, json.dumps(value))
+            return cached[1]
+        return value
 
     def setData(self, index, value, role):
         if not index.isValid() or role != Qt.ItemDataRole.EditRole:
@@ -89,26 +188,25 @@ class TransactionTableModel(QAbstractTableModel):
                     return False
 
         elif column_name == 'transaction_type':
-            try:
-                if isinstance(value, str):
-                    self._data[row][column_name] = TransactionType(value)
-                else:
-                    self._data[row][column_name] = value
-            except ValueError:
+            # Plain dict lookup instead of an enum call that raises on unknown text
+            converted = TRANSACTION_TYPE_BY_VALUE.get(value) if isinstance(value, str) else value
+            if isinstance(value, str) and converted is None:
                 self._data[row]['transaction_type_str'] = value
                 self._add_error(row, f"Invalid transaction type: {value}")
                 return False
+            self._data[row][column_name] = converted
+            if converted == TransactionType.OPTION_EXPIRATION:
+                self._option_expiration_rows.add(row)
+            else:
+                self._option_expiration_rows.discard(row)
 
         elif column_name == 'instrument_type':
-            try:
-                if isinstance(value, str):
-                    self._data[row][column_name] = InstrumentType(value)
-                else:
-                    self._data[row][column_name] = value
-            except ValueError:
+            converted = INSTRUMENT_TYPE_BY_VALUE.get(value) if isinstance(value, str) else value
+            if isinstance(value, str) and converted is None:
                 self._data[row]['instrument_type_str'] = value
                 self._add_error(row, f"Invalid instrument type: {value}")
                 return False
+            self._data[row][column_name] = converted
 
         elif column_name in ('quantity', 'price', 'fees', 'amount'):
             try:
@@ -123,6 +221,8 @@ class TransactionTableModel(QAbstractTableModel):
                 return False
 
         elif column_name == 'journal_details':
+            # The old value's cached JSON text no longer applies
+            self._journal_text.pop(id(self._data[row].get(column_name)), None)
             if isinstance(value, dict):
                 self._data[row][column_name] = value
             elif value is None or value == "":
@@ -138,27 +238,44 @@ class TransactionTableModel(QAbstractTableModel):
         else:  # Handle string columns (symbol, account_name, notes)
             self._data[row][column_name] = value
 
+        # Columns whose display may have changed with this edit
+        changed_cols = {col}
+
         # Recalculate amount if quantity, price, or fees changed
         if column_name in ('quantity', 'price', 'fees') and 'transaction_type' in self._data[row]:
             ttype = self._data[row]['transaction_type']
-            if ttype in (TransactionType.BUY, TransactionType.SELL):
-                calculated_amount = calculate_amount(
+            if ttype in TRADE_FEE_SIGNS:
+                calculated_amount = calculate_trade_amount(
                     self._data[row].get('quantity'),
                     self._data[row].get('price'),
                     self._data[row].get('fees'),
-                    ttype.value
+                    TRADE_FEE_SIGNS[ttype]
                 )
                 if calculated_amount is not None:
                     self._data[row]['amount'] = calculated_amount
+                    if 'amount' in self._col_idx:
+                        changed_cols.add(self._col_idx['amount'])
 
         # Re-validate the row
+        had_errors = row in self._error_rows
+        old_errors = list(self._data[row].get('errors') or ())
         self._validate_row(row)
 
-        # Emit dataChanged signal for the whole row since validation might affect multiple columns
-        self.dataChanged.emit(
-            self.index(row, 0),
-            self.index(row, self.columnCount() - 1)
-        )
+        if (row in self._error_rows) != had_errors:
+            # The error background covers the whole row
+            self.dataChanged.emit(
+                self.index(row, 0),
+                self.index(row, self.columnCount() - 1),
+                _EDIT_ROLES + (_BACKGROUND_ROLE,)
+            )
+        else:
+            if self._data[row].get('errors') != old_errors and 'errors' in self._col_idx:
+                changed_cols.add(self._col_idx['errors'])
+            self.dataChanged.emit(
+                self.index(row, min(changed_cols)),
+                self.index(row, max(changed_cols)),
+                _EDIT_ROLES
+            )
 
         return True
 
@@ -175,6 +292,7 @@ class TransactionTableModel(QAbstractTableModel):
 
         if error_message not in self._data[row]['errors']:
             self._data[row]['errors'].append(error_message)
+            self._error_rows.add(row)
 
     def _remove_error(self, row, error_message):
         """Remove an error message from a row."""
@@ -182,66 +300,63 @@ class TransactionTableModel(QAbstractTableModel):
             self._data[row]['errors'].remove(error_message)
             if not self._data[row]['errors']:
                 del self._data[row]['errors']
+                self._error_rows.discard(row)
 
     def _validate_row(self, row):
         """Validate all fields in a row and update error messages."""
         data = self._data[row]
 
-        # Clear existing errors
-        data['errors'] = []
+        # Collect the row's errors in one pass, replacing any existing ones
+        errors = []
 
         # Check required fields based on transaction type
-        if 'transaction_date' not in data or not data['transaction_date']:
-            self._add_error(row, "Date is required")
+        if not data.get('transaction_date'):
+            errors.append("Date is required")
 
-        if 'transaction_type' not in data or not data['transaction_type']:
-            self._add_error(row, "Transaction type is required")
+        if not data.get('transaction_type'):
+            errors.append("Transaction type is required")
 
-        if 'account_name' not in data or not data['account_name'] or data['account_name'].strip() == '':
-            self._add_error(row, "Account name is required")
-        else:
-            # Explicitly remove any account-related errors when account is valid
-            errors_to_remove = []
-            for error in data.get('errors', []):
-                if 'account name' in error.lower():
-                    errors_to_remove.append(error)
-
-            for error in errors_to_remove:
-                self._remove_error(row, error)
+        account_name = data.get('account_name')
+        if not account_name or account_name.strip() == '':
+            errors.append("Account name is required")
 
         if 'transaction_type' in data:
             ttype = data['transaction_type']
 
             # Symbol requirements
-            symbol_required = ttype in [
-                TransactionType.BUY, TransactionType.SELL, 
-                TransactionType.DIVIDEND, TransactionType.SPLIT
-            ]
-
-            if symbol_required:
-                if 'symbol' not in data or not data['symbol']:
-                    self._add_error(row, "Symbol is required for this transaction type")
+            if ttype in _SYMBOL_REQUIRED_TYPES:
+                if not data.get('symbol'):
+                    errors.append("Symbol is required for this transaction type")
 
-                if 'instrument_type' not in data or not data['instrument_type']:
-                    self._add_error(row, "Instrument type is required when symbol is provided")
+                if not data.get('instrument_type'):
+                    errors.append("Instrument type is required when symbol is provided")
 
             # Validate fields by transaction type
-            if ttype in [TransactionType.BUY, TransactionType.SELL]:
-                if 'quantity' not in data or data.get('quantity') is None:
-                    self._add_error(row, "Quantity is required for buy/sell transactions")
+            if ttype in _BUY_SELL_TYPES:
+                if data.get('quantity') is None:
+                    errors.append("Quantity is required for buy/sell transactions")
 
-                if 'price' not in data or data.get('price') is None:
-                    self._add_error(row, "Price is required for buy/sell transactions")
+                if data.get('price') is None:
+                    errors.append("Price is required for buy/sell transactions")
 
             # Amount validation
-            if 'amount' not in data or data.get('amount') is None:
-                self._add_error(row, "Amount is required for all transactions")
+            if data.get('amount') is None:
+                errors.append("Amount is required for all transactions")
 
-        return len(data.get('errors', [])) == 0
+        data['errors'] = errors
+        if errors:
+            self._error_rows.add(row)
+        else:
+            self._error_rows.discard(row)
+        return not errors
 
     def hasErrors(self):
         """Check if any rows have validation errors."""
-        return any(row.get('errors') for row in self._data)
+        return bool(self._error_rows)
+
+    def getOptionExpirationRows(self):
+        """Get the rows holding option expiration transactions."""
+        return self._option_expiration_rows
 
     def getTransactions(self):
         """Get transaction data for saving."""
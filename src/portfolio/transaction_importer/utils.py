@@ -1,16 +1,112 @@
 import logging
 import json
 import os
+import threading
 from pathlib import Path
 from typing import Dict, Optional, Union
 from decimal import Decimal
 
-from portfolio.models import TransactionType
+try:
+    import orjson
+except ImportError:  # Optional dependency; mapping files fall back to the stdlib json module
+    orjson = None
+
+from portfolio.models import TRANSACTION_TYPE_BY_VALUE, TransactionType
 
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Mapped values whose direction is decided by the quantity's sign
+_TRANSFER_VALUES = frozenset({TransactionType.TRANSFER_IN.value, TransactionType.TRANSFER_OUT.value})
+
+
+# Default mappings for common brokers, copied into each new mapper
+_DEFAULT_MAPPINGS: Dict[str, Dict[str, str]] = {
+    # Common transaction type mappings
+    "general": {
+        "buy": TransactionType.BUY.value,
+        "sell": TransactionType.SELL.value,
+        "dividend": TransactionType.DIVIDEND.value,
+        "interest": TransactionType.INTEREST.value,
+        "deposit": TransactionType.DEPOSIT.value,
+        "withdrawal": TransactionType.WITHDRAWAL.value,
+        "fee": TransactionType.FEE.value,
+        "split": TransactionType.SPLIT.value,
+        # Transfer-specific mappings
+        "transfer": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "journal": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "transfer shares": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "journal shares": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "transfer securities": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "transfer funds": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+        "securities transferred": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
+    },
+    # Fidelity-specific mappings
+    "fidelity": {
+        "bought": TransactionType.BUY.value,
+        "sold": TransactionType.SELL.value,
+        "cash contribution": TransactionType.DEPOSIT.value,
+        "dividend received": TransactionType.DIVIDEND.value,
+        "reinvestment": TransactionType.BUY.value,
+        "transferred in": TransactionType.TRANSFER_IN.value,
+        "transferred out": TransactionType.TRANSFER_OUT.value,
+        "journaled": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+    },
+    # Schwab-specific mappings
+    "schwab": {
+        "bought": TransactionType.BUY.value,
+        "sold": TransactionType.SELL.value,
+        "qualified dividend": TransactionType.DIVIDEND.value,
+        "non-qualified dividend": TransactionType.DIVIDEND.value,
+        "bank interest": TransactionType.INTEREST.value,
+        "service fee": TransactionType.FEE.value,
+        "journal": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+        "moneylink transfer": TransactionType.TRANSFER_IN.value,
+    },
+    # Robinhood-specific mappings
+    "robinhood": {
+        "market buy": TransactionType.BUY.value,
+        "market sell": TransactionType.SELL.value,
+        "limit buy": TransactionType.BUY.value,
+        "limit sell": TransactionType.SELL.value,
+        "dividend": TransactionType.DIVIDEND.value,
+        "deposit": TransactionType.DEPOSIT.value,
+        "withdrawal": TransactionType.WITHDRAWAL.value,
+        "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+    },
+    # Interactive Brokers-specific mappings
+    "ibkr": {
+        "buy": TransactionType.BUY.value,
+        "sell": TransactionType.SELL.value,
+        "dividend": TransactionType.DIVIDEND.value,
+        "deposit": TransactionType.DEPOSIT.value,
+        "withdrawal": TransactionType.WITHDRAWAL.value,
+        "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+        "cash transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+    },
+    # TD Ameritrade-specific mappings
+    "tdameritrade": {
+        "bought": TransactionType.BUY.value,
+        "sold": TransactionType.SELL.value,
+        "reinvestment": TransactionType.BUY.value,
+        "dividend": TransactionType.DIVIDEND.value,
+        "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
+    }
+}
+
+
+def dump_mapping_json(obj) -> bytes:
+    """Serialize an object to indented JSON bytes, as written to mapping files."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode('utf-8')
+
+
+def load_mapping_json(data: bytes):
+    """Parse JSON bytes read from a mapping file."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class TransactionTypeMapper:
     """Maps broker-specific transaction descriptions to standardized transaction types.
@@ -23,6 +119,11 @@ class TransactionTypeMapper:
 
     def __init__(self, mapping_file: Optional[str] = None):
         self.mappings: Dict[str, Dict[str, str]] = {}
+        # Bumped whenever the mappings are loaded or saved, so cached lookups
+        # made against older mappings are not reused
+        self.revision = 0
+        # Contents of the mappings file as last read or written, so unchanged saves can be skipped
+        self._saved_data: Optional[bytes] = None
         self.mapping_file = mapping_file or self._get_default_mapping_path()
         self._load_mappings()
 
@@ -30,23 +131,32 @@ class TransactionTypeMapper:
     def _get_default_mapping_path() -> str:
         """Returns the default path for the transaction type mappings file."""
         # Store in user's home directory to persist across application updates
+        # The directory is created when the mappings are first saved
         home_dir = Path.home()
         app_dir = home_dir / ".portfolio-tracker"
-        app_dir.mkdir(exist_ok=True)
         return str(app_dir / "transaction_type_mappings.json")
 
     def _load_mappings(self) -> None:
         """Load mappings from the JSON file."""
-        if not os.path.exists(self.mapping_file):
-            # Initialize with default mappings if file doesn't exist
-            self._init_default_mappings()
-            self._save_mappings()
-            return
-
+        self.revision += 1
+        self._saved_data = None
         try:
-            with open(self.mapping_file, 'r') as f:
-                self.mappings = json.load(f)
+            # Opening the file directly covers the existence check too
+            data = Path(self.mapping_file).read_bytes()
+            mappings = load_mapping_json(data)
+            # Brokers and actions are matched lowercased, so lowercase the keys once here rather
+            # than per lookup; hand-edited files may not be, and sections differing only in case merge
+            self.mappings = {}
+            for broker, actions in mappings.items():
+                broker_mappings = self.mappings.setdefault(broker.lower(), {})
+                for action_text, ttype in actions.items():
+                    broker_mappings[action_text.lower()] = ttype
+            self._saved_data = data
             logger.info(f"Loaded transaction type mappings from {self.mapping_file}")
+        except FileNotFoundError:
+            # Initialize with default mappings if file doesn't exist; the file is
+            # only written once the mappings are actually changed
+            self._init_default_mappings()
         except Exception as e:
             logger.error(f"Error loading transaction type mappings: {str(e)}")
             # Initialize with defaults on error
@@ -54,87 +164,31 @@ class TransactionTypeMapper:
 
     def _save_mappings(self) -> None:
         """Save current mappings to the JSON file."""
+        self.revision += 1
+        data = dump_mapping_json(self.mappings)
+        if data == self._saved_data:
+            return
+
         try:
-            with open(self.mapping_file, 'w') as f:
-                json.dump(self.mappings, f, indent=2)
+            mapping_path = Path(self.mapping_file)
+            mapping_path.parent.mkdir(exist_ok=True)
+            # Write a temporary file and swap it in, so a crash mid-write can't
+            # leave a truncated mappings file behind
+            tmp_path = mapping_path.with_name(mapping_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, mapping_path)
+            self._saved_data = data
             logger.info(f"Saved transaction type mappings to {self.mapping_file}")
         except Exception as e:
             logger.error(f"Error saving transaction type mappings: {str(e)}")
 
     def _init_default_mappings(self) -> None:
         """Initialize with default mappings for common brokers."""
-        self.mappings = {
-            # Common transaction type mappings
-            "general": {
-                "buy": TransactionType.BUY.value,
-                "sell": TransactionType.SELL.value,
-                "dividend": TransactionType.DIVIDEND.value,
-                "interest": TransactionType.INTEREST.value,
-                "deposit": TransactionType.DEPOSIT.value,
-                "withdrawal": TransactionType.WITHDRAWAL.value,
-                "fee": TransactionType.FEE.value,
-                "split": TransactionType.SPLIT.value,
-                # Transfer-specific mappings
-                "transfer": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "journal": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "transfer shares": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "journal shares": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "transfer securities": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "transfer funds": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-                "securities transferred": TransactionType.TRANSFER_IN.value,  # Default, will be adjusted based on quantity
-            },
-            # Fidelity-specific mappings
-            "fidelity": {
-                "bought": TransactionType.BUY.value,
-                "sold": TransactionType.SELL.value,
-                "cash contribution": TransactionType.DEPOSIT.value,
-                "dividend received": TransactionType.DIVIDEND.value,
-                "reinvestment": TransactionType.BUY.value,
-                "transferred in": TransactionType.TRANSFER_IN.value,
-                "transferred out": TransactionType.TRANSFER_OUT.value,
-                "journaled": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-            },
-            # Schwab-specific mappings
-            "schwab": {
-                "bought": TransactionType.BUY.value,
-                "sold": TransactionType.SELL.value,
-                "qualified dividend": TransactionType.DIVIDEND.value,
-                "non-qualified dividend": TransactionType.DIVIDEND.value,
-                "bank interest": TransactionType.INTEREST.value,
-                "service fee": TransactionType.FEE.value,
-                "journal": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-                "MoneyLink Transfer": TransactionType.TRANSFER_IN.value,
-            },
-            # Robinhood-specific mappings
-            "robinhood": {
-                "market buy": TransactionType.BUY.value,
-                "market sell": TransactionType.SELL.value,
-                "limit buy": TransactionType.BUY.value,
-                "limit sell": TransactionType.SELL.value,
-                "dividend": TransactionType.DIVIDEND.value,
-                "deposit": TransactionType.DEPOSIT.value,
-                "withdrawal": TransactionType.WITHDRAWAL.value,
-                "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-            },
-            # Interactive Brokers-specific mappings
-            "ibkr": {
-                "buy": TransactionType.BUY.value,
-                "sell": TransactionType.SELL.value,
-                "dividend": TransactionType.DIVIDEND.value,
-                "deposit": TransactionType.DEPOSIT.value,
-                "withdrawal": TransactionType.WITHDRAWAL.value,
-                "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-                "cash transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-            },
-            # TD Ameritrade-specific mappings
-            "tdameritrade": {
-                "bought": TransactionType.BUY.value,
-                "sold": TransactionType.SELL.value,
-                "reinvestment": TransactionType.BUY.value,
-                "dividend": TransactionType.DIVIDEND.value,
-                "transfer": TransactionType.TRANSFER_IN.value,  # Will be adjusted based on quantity
-            }
-        }
+        # Values are strings, so copying each broker's dict is enough to keep the defaults intact
+        self.mappings = {broker: dict(actions) for broker, actions in _DEFAULT_MAPPINGS.items()}
 
     def add_mapping(self, broker: str, action_text: str, transaction_type: Union[TransactionType, str]) -> None:
         """Add a new mapping for a specific broker.
@@ -144,6 +198,7 @@ class TransactionTypeMapper:
             action_text: The action text from the broker's CSV (lowercase)
             transaction_type: The TransactionType enum or string value to map to
         """
+        broker = broker.lower()
         if broker not in self.mappings:
             self.mappings[broker] = {}
 
@@ -172,8 +227,9 @@ class TransactionTypeMapper:
         result = None
 
         # Check broker-specific mapping first if provided
-        if broker and broker.lower() in self.mappings:
-            for key, value in self.mappings[broker.lower()].items():
+        broker_mappings = self.mappings.get(broker.lower()) if broker else None
+        if broker_mappings is not None:
+            for key, value in broker_mappings.items():
                 if key in action_lower:
                     result = value
                     break
@@ -186,7 +242,7 @@ class TransactionTypeMapper:
                     break
 
         # If we found a transfer type and have quantity info, determine direction
-        if result in [TransactionType.TRANSFER_IN.value, TransactionType.TRANSFER_OUT.value] and quantity is not None:
+        if result in _TRANSFER_VALUES and quantity is not None:
             # For transfers, if quantity is negative, it's a transfer out
             # if quantity is positive, it's a transfer in
             if quantity < 0:
@@ -196,14 +252,33 @@ class TransactionTypeMapper:
 
         # Convert string value to TransactionType enum
         if result is not None:
-            try:
-                return TransactionType(result)
-            except ValueError:
+            transaction_type = TRANSACTION_TYPE_BY_VALUE.get(result)
+            if transaction_type is None:
                 logger.warning(f"Invalid transaction type mapping: {result}")
-                return None
+            return transaction_type
 
         return None
 
 
-# Create a singleton instance for global use
-transaction_type_mapper = TransactionTypeMapper()
+# Singleton instance for global use, created on first use so that importing this
+# module doesn't touch the mappings file
+_mapper_instance: Optional[TransactionTypeMapper] = None
+_mapper_lock = threading.Lock()
+
+
+def get_transaction_type_mapper() -> TransactionTypeMapper:
+    """Return the shared TransactionTypeMapper, creating it on first use."""
+    global _mapper_instance
+    if _mapper_instance is None:
+        # CSV files are parsed on a worker thread, so two threads may get here at once
+        with _mapper_lock:
+            if _mapper_instance is None:
+                _mapper_instance = TransactionTypeMapper()
+    return _mapper_instance
+
+
+def __getattr__(name):
+    """Create the shared mapper on first access of transaction_type_mapper (PEP 562)."""
+    if name == 'transaction_type_mapper':
+        return get_transaction_type_mapper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
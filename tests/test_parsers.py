@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+from decimal import Decimal
+
+from portfolio.models import TransactionType
+from portfolio.transaction_importer import utils
+from portfolio.transaction_importer.csv_import import import_transactions_from_csv
+from portfolio.transaction_importer.parsers import standardize_option_transaction_type
+
+
+class StandardizeTransactionTypeTest(unittest.TestCase):
+    def setUp(self):
+        # Use the default mappings rather than the user's mappings file
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self._saved_mapper = utils._mapper_instance
+        utils._mapper_instance = utils.TransactionTypeMapper(
+            os.path.join(self._tmpdir.name, "transaction_type_mappings.json"))
+
+    def tearDown(self):
+        utils._mapper_instance = self._saved_mapper
+        self._tmpdir.cleanup()
+
+    def test_nan_quantity_is_classified_like_a_missing_one(self):
+        self.assertEqual(standardize_option_transaction_type('Buy', False, Decimal('NaN')),
+                         TransactionType.BUY)
+        self.assertEqual(standardize_option_transaction_type('Journal Shares', False, Decimal('NaN')),
+                         TransactionType.TRANSFER_IN)
+
+    def test_quantity_sign_sets_transfer_direction(self):
+        self.assertEqual(standardize_option_transaction_type('Journal Shares', False, Decimal('-5')),
+                         TransactionType.TRANSFER_OUT)
+        self.assertEqual(standardize_option_transaction_type('Journal Shares', False, Decimal('5')),
+                         TransactionType.TRANSFER_IN)
+
+    def test_csv_row_with_nan_quantity_keeps_its_type(self):
+        path = os.path.join(self._tmpdir.name, "fidelity.csv")
+        with open(path, 'w', newline='') as f:
+            f.write("Run Date,Action,Symbol,Quantity,Price,Amount,Account\n"
+                    "01/02/2024,YOU BOUGHT,AAPL,NaN,10,-100,Brokerage (Fidelity)\n")
+        mappings = {'date': 'Run Date', 'action': 'Action', 'symbol': 'Symbol', 'quantity': 'Quantity',
+                    'price': 'Price', 'amount': 'Amount', 'account_name': 'Account'}
+
+        transactions = import_transactions_from_csv(path, mappings)
+
+        self.assertEqual(len(transactions), 1)
+        self.assertEqual(transactions[0]['transaction_type'], TransactionType.BUY)
+        self.assertFalse(any(error.startswith("Could not determine transaction type")
+                             for error in transactions[0].get('errors', [])))
+
+
+if __name__ == "__main__":
+    unittest.main()